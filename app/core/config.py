@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -13,6 +15,33 @@ class Settings(BaseSettings):
 
     ACCESS_TOKEN_SECRET: str
     REFRESH_TOKEN_SECRET: str
+    JWT_BACKEND: Literal["hs256", "jose"] = "hs256"
+
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT_SECONDS: float = 30.0
+    DATABASE_POOL_RECYCLE_SECONDS: int = -1
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_ECHO: Optional[bool] = None  # follows DEBUG when unset
+    DATABASE_STATEMENT_CACHE_SIZE: int = 100  # 0 behind pgbouncer in transaction mode
+    DATABASE_STATEMENT_TIMEOUT_MS: Optional[int] = None
+    DATABASE_REPLICA_URL: Optional[str] = None
+    DATABASE_READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    REDIS_URL: Optional[str] = None
+
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_TIMEOUT_SECONDS: float = 10.0
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+
+    TYPING_COALESCE_WINDOW_SECONDS: float = 1.0
+
+    MESSAGE_WRITE_BEHIND: bool = False
+    MESSAGE_BATCH_SIZE: int = 500
+    MESSAGE_BATCH_INTERVAL_SECONDS: float = 0.05
+    MESSAGE_QUEUE_SIZE: int = 10_000
 
     class Config:
         env_file = ".env"
@@ -1,10 +1,29 @@
 GOOGLE_OAUTH_AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
 GOOGLE_OAUTH_TOKEN_URL = "https://oauth2.googleapis.com/token"
 GOOGLE_OAUTH_CERTS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+JWKS_DEFAULT_MAX_AGE_SECONDS = 3600
+JWKS_REFRESH_MARGIN_SECONDS = 60
+JWKS_MIN_REFRESH_INTERVAL_SECONDS = 30
 JWT_ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_SECONDS = 900  # 15 minutes
 REFRESH_TOKEN_EXPIRE_SECONDS = 60 * 60 * 24 * 30  # 30 days
+ACCESS_TOKEN_CACHE_SIZE = 10_000
 WS_POLICY_VIOLATION = 1008
+WS_TRY_AGAIN_LATER = 1013
+WS_SEND_QUEUE_SIZE = 256
+WS_SEND_TIMEOUT_SECONDS = 5.0
+WS_ROOM_LOCK_SHARDS = 64
+WIDGET_SCOPE_CACHE_SIZE = 10_000
+MESSAGE_PAGE_SIZE = 50
+MESSAGE_PAGE_SIZE_MAX = 100
+MESSAGE_EXPORT_BATCH_SIZE = 1000
+MESSAGE_PREVIEW_LENGTH = 140
+CONVERSATION_PAGE_SIZE = 50
+CONVERSATION_PAGE_SIZE_MAX = 100
+PENDING_CONVERSATION_PAGE_SIZE = 50
+PENDING_CONVERSATION_PAGE_SIZE_MAX = 100
+PENDING_MESSAGE_PREVIEW_COUNT = 3
+PENDING_MESSAGE_PREVIEW_COUNT_MAX = 20
 NANO_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 NANO_LENGTH = 10
 MAX_RETRIES = 5
@@ -1,21 +1,176 @@
-from collections.abc import AsyncGenerator
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Optional, TypedDict, cast
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import declarative_base
+from sqlalchemy import AsyncAdaptedQueuePool, Engine, event, make_url
+from sqlalchemy.exc import TimeoutError as SQLAlchemyTimeoutError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import ORMExecuteState, Session, declarative_base
+from sqlalchemy.pool import ConnectionPoolEntry
 
 from app.core.config import settings
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
+
+# Times checkouts that find the pool exhausted, so pool pressure shows up as
+# wait time in the metrics instead of only as timeouts. Checkouts that get an
+# idle connection or open a new one are only counted: connect time is not
+# time spent waiting for the pool.
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    @property
+    def is_exhausted(self) -> bool:
+        return self.checkedin() == 0 and -1 < self._max_overflow <= self.overflow()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        exhausted = self.is_exhausted
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except SQLAlchemyTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.checkouts += 1
+            if exhausted:
+                waited = time.perf_counter() - started
+                self.waits += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+class PoolStats(TypedDict):
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: int
+    waits: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+
+def _get_connect_args(url: str) -> dict[str, Any]:
+    if make_url(url).get_driver_name() != "asyncpg":
+        return {}
+
+    server_settings: dict[str, str] = {}
+    if settings.DATABASE_STATEMENT_TIMEOUT_MS is not None:
+        server_settings["statement_timeout"] = str(settings.DATABASE_STATEMENT_TIMEOUT_MS)
+
+    return {
+        "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+        "server_settings": server_settings,
+    }
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG if settings.DATABASE_ECHO is None else settings.DATABASE_ECHO,
+        poolclass=InstrumentedPool,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
+        connect_args=_get_connect_args(url),
+    )
+
+
+engine = _create_engine(settings.DATABASE_URL)
+replica_engine = (
+    _create_engine(settings.DATABASE_REPLICA_URL) if settings.DATABASE_REPLICA_URL else None
 )
 
+# Identifies who is making the current request (set once the user is
+# authenticated), so their writes can be routed around replica lag.
+read_your_writes_key: ContextVar[Optional[str]] = ContextVar(
+    "read_your_writes_key",
+    default=None,
+)
+
+# Last write per key, oldest first. Kept per process: with several workers
+# a read may land on a worker that has not seen the write.
+_recent_writes: OrderedDict[str, float] = OrderedDict()
+
+
+def mark_recent_write() -> None:
+    key = read_your_writes_key.get()
+    if key is None:
+        return
+
+    now = time.monotonic()
+    _recent_writes[key] = now
+    _recent_writes.move_to_end(key)
+
+    cutoff = now - settings.DATABASE_READ_YOUR_WRITES_SECONDS
+    while _recent_writes and next(iter(_recent_writes.values())) < cutoff:
+        _recent_writes.popitem(last=False)
+
+
+def _wrote_recently() -> bool:
+    key = read_your_writes_key.get()
+    if key is None or key not in _recent_writes:
+        return False
+    return time.monotonic() - _recent_writes[key] < settings.DATABASE_READ_YOUR_WRITES_SECONDS
+
+
+# Writes are recorded as they are issued rather than on commit, so a read
+# racing the commit is already routed to the primary.
+class PrimarySession(Session):
+    pass
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _on_flush(_session: Session, _flush_context: Any) -> None:
+    mark_recent_write()
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _on_execute(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mark_recent_write()
+
+
+# Sends reads to the replica when one is configured, unless the current
+# user has written recently and the replica might not have caught up.
+class ReadSession(Session):
+    def get_bind(self, *args: Any, **kwargs: Any) -> Engine:
+        if replica_engine is None or _wrote_recently():
+            return engine.sync_engine
+        return replica_engine.sync_engine
+
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=PrimarySession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
+ReadSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=ReadSession,
     expire_on_commit=False,
     autoflush=False,
 )
@@ -23,15 +178,67 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+# Registers work (typically a broadcast) to run once the session's unit of
+# work has committed; it is dropped if the unit of work rolls back. Replies
+# to the originating socket are sent after session_scope exits, so they
+# follow these callbacks rather than racing ahead of the commit.
+def after_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+# A unit of work: services only flush, and the scope commits once on
+# success (then runs the after_commit callbacks) or rolls back on error.
+# WebSocket handlers open one per frame instead of holding a session (and
+# possibly a pooled connection) for the life of the socket.
+@asynccontextmanager
+async def session_scope() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         try:
             yield session
             await session.commit()
         except Exception:
+            session.info.pop("after_commit", None)
             await session.rollback()
             raise
 
+        callbacks: list[Callable[[], Awaitable[None]]] = session.info.pop("after_commit", [])
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception:
+                logging.exception("after_commit callback failed")
+
+
+# Endpoints depend on this with scope="function", so the commit happens
+# before the response is sent rather than after it.
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with session_scope() as session:
+        yield session
+
+
+# For read-only endpoints; see ReadSession.
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with ReadSessionLocal() as session:
+        yield session
+
+
+def get_pool_stats(engine: AsyncEngine = engine) -> PoolStats:
+    pool = cast(InstrumentedPool, engine.pool)
+    return PoolStats(
+        pool_size=pool.size(),
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        checked_out=pool.checkedout(),
+        checked_in=pool.checkedin(),
+        overflow=max(pool.overflow(), 0),
+        checkouts=pool.checkouts,
+        waits=pool.waits,
+        timeouts=pool.timeouts,
+        wait_seconds_total=pool.wait_seconds_total,
+        wait_seconds_max=pool.wait_seconds_max,
+    )
+
 
 async def dispose_engine() -> None:
     await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
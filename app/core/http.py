@@ -0,0 +1,43 @@
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+# One client for the life of the application, so outbound calls (Google
+# OAuth) reuse pooled keep-alive connections instead of paying for a new
+# TCP and TLS handshake each time. Created and closed by the lifespan.
+class HTTPClientHolder:
+    def __init__(self):
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def start(self) -> None:
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(
+                settings.HTTP_TIMEOUT_SECONDS,
+                connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+            ),
+        )
+
+    async def stop(self) -> None:
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+
+    def get(self) -> httpx.AsyncClient:
+        if self.client is None:
+            raise RuntimeError("HTTP client is not started")
+        return self.client
+
+
+http_client = HTTPClientHolder()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    return http_client.get()
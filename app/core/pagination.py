@@ -0,0 +1,25 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Tuple
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+# Keyset cursors are opaque to clients: a (timestamp, id) pair identifying
+# the row a page starts after.
+def encode_cursor(timestamp: datetime, row_id: str) -> str:
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        timestamp, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), row_id
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional, Set, cast
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+
+MessageHandler = Callable[[str, str], Awaitable[None]]
+
+
+class PubSubBackend(ABC):
+    def __init__(self):
+        self.handler: Optional[MessageHandler] = None
+
+    async def start(self, handler: MessageHandler) -> None:
+        self.handler = handler
+
+    async def stop(self) -> None:
+        self.handler = None
+
+    @abstractmethod
+    async def subscribe(self, room: str) -> None: ...
+
+    @abstractmethod
+    async def unsubscribe(self, room: str) -> None: ...
+
+    @abstractmethod
+    async def publish(self, room: str, frame: str) -> None: ...
+
+
+# Delivers published messages straight back to this process. Used when no
+# broker is configured (single worker, local development).
+class LocalPubSubBackend(PubSubBackend):
+    def __init__(self):
+        super().__init__()
+        self.rooms: Set[str] = set()
+
+    async def subscribe(self, room: str) -> None:
+        self.rooms.add(room)
+
+    async def unsubscribe(self, room: str) -> None:
+        self.rooms.discard(room)
+
+    async def publish(self, room: str, frame: str) -> None:
+        if self.handler and room in self.rooms:
+            await self.handler(room, frame)
+
+
+# Fans messages out through Redis pub/sub so that every worker holding a
+# socket for the room receives them. Each worker only subscribes to the
+# rooms it currently has sockets for.
+class RedisPubSubBackend(PubSubBackend):
+    def __init__(self, url: str, channel_prefix: str = "ws:"):
+        super().__init__()
+        self.redis = Redis.from_url(url)  # type: ignore
+        self.pubsub = self.redis.pubsub()  # type: ignore
+        self.channel_prefix = channel_prefix
+        self.has_subscriptions = asyncio.Event()
+        self.reader_task: Optional[asyncio.Task[None]] = None
+
+    async def start(self, handler: MessageHandler) -> None:
+        await super().start(handler)
+        self.reader_task = asyncio.create_task(self._read_loop())
+
+    async def stop(self) -> None:
+        if self.reader_task:
+            self.reader_task.cancel()
+            try:
+                await self.reader_task
+            except asyncio.CancelledError:
+                pass
+            self.reader_task = None
+
+        await self.pubsub.aclose()
+        await self.redis.aclose()
+        await super().stop()
+
+    async def subscribe(self, room: str) -> None:
+        await self.pubsub.subscribe(self._channel(room))
+        self.has_subscriptions.set()
+
+    async def unsubscribe(self, room: str) -> None:
+        await self.pubsub.unsubscribe(self._channel(room))  # type: ignore
+        if not self.pubsub.subscribed:
+            self.has_subscriptions.clear()
+
+    async def publish(self, room: str, frame: str) -> None:
+        await self.redis.publish(self._channel(room), frame)  # type: ignore
+
+    def _channel(self, room: str) -> str:
+        return f"{self.channel_prefix}{room}"
+
+    async def _read_loop(self) -> None:
+        while True:
+            await self.has_subscriptions.wait()
+
+            try:
+                data = cast(
+                    Optional[dict[str, Any]],
+                    await self.pubsub.get_message(
+                        ignore_subscribe_messages=True,
+                        timeout=1.0,
+                    ),
+                )
+            except Exception:
+                logging.exception("Redis pub/sub read failed")
+                await asyncio.sleep(1.0)
+                continue
+
+            if not data or not self.handler:
+                continue
+
+            channel = data["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+
+            frame = data["data"]
+            if isinstance(frame, bytes):
+                frame = frame.decode()
+
+            room = str(channel).removeprefix(self.channel_prefix)
+
+            try:
+                await self.handler(room, str(frame))
+            except Exception:
+                logging.exception(f"Failed to deliver message for room {room}")
+
+
+def create_pubsub_backend() -> PubSubBackend:
+    if settings.REDIS_URL:
+        return RedisPubSubBackend(settings.REDIS_URL)
+    return LocalPubSubBackend()
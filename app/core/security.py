@@ -3,7 +3,8 @@ from typing import Optional
 from fastapi import Depends, HTTPException, WebSocket, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from app.core.tokens import verify_access_token
+from app.core.database import read_your_writes_key
+from app.core.tokens import InvalidTokenError, verify_access_token
 
 security = HTTPBearer()
 
@@ -15,8 +16,9 @@ async def get_current_user_id_ws(websocket: WebSocket) -> Optional[str]:
 
     try:
         user = verify_access_token(token)
+        read_your_writes_key.set(user.sub)
         return user.sub
-    except Exception:
+    except InvalidTokenError:
         return None
 
 
@@ -26,15 +28,17 @@ async def get_current_user_id(
     token = credentials.credentials
     try:
         payload = verify_access_token(token)
-        user_id = payload.sub
-        if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token: missing user ID",
-            )
-        return user_id
-    except Exception:
+    except InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
+
+    user_id = payload.sub
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: missing user ID",
+        )
+    read_your_writes_key.set(user_id)
+    return user_id
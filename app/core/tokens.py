@@ -1,9 +1,19 @@
-from datetime import UTC, datetime, timedelta
+import base64
+import hashlib
+import hmac
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional, TypedDict, cast
 
-from jose import jwt
+from jose import JWTError, jwt
+from pydantic import ValidationError
 
 from app.core.config import settings
 from app.core.constants import (
+    ACCESS_TOKEN_CACHE_SIZE,
     ACCESS_TOKEN_EXPIRE_SECONDS,
     JWT_ALGORITHM,
     REFRESH_TOKEN_EXPIRE_SECONDS,
@@ -11,35 +21,185 @@ from app.core.constants import (
 from app.core.schema import TokenPayload
 
 
+# Raised for any token that does not verify: malformed, bad signature,
+# wrong algorithm, expired or missing claims, whatever the codec.
+class InvalidTokenError(Exception):
+    pass
+
+
+class TokenCodec(ABC):
+    @abstractmethod
+    def encode(self, claims: dict[str, Any]) -> str: ...
+
+    # Returns the claims of a token signed with this codec's secret whose
+    # exp has not passed, or raises InvalidTokenError.
+    @abstractmethod
+    def decode(self, token: str) -> dict[str, Any]: ...
+
+
+class JoseTokenCodec(TokenCodec):
+    def __init__(self, secret: str):
+        self.secret = secret
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        return jwt.encode(claims, self.secret, JWT_ALGORITHM)
+
+    def decode(self, token: str) -> dict[str, Any]:
+        try:
+            return jwt.decode(token, self.secret, algorithms=[JWT_ALGORITHM])
+        except JWTError as e:
+            raise InvalidTokenError(str(e)) from e
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+_encode_json = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+# Byte-for-byte the header python-jose emits, so tokens from either codec
+# verify with the other.
+_HS256_HEADER = _b64encode(_encode_json({"alg": JWT_ALGORITHM, "typ": "JWT"}).encode())
+
+
+# HS256 only, implemented directly on hmac: the keyed hash state is built
+# once and copied per token, the header segment is a constant and claims
+# are serialized with a preconfigured compact encoder.
+class HS256TokenCodec(TokenCodec):
+    def __init__(self, secret: str):
+        self.mac = hmac.new(secret.encode(), digestmod=hashlib.sha256)
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        signing_input = _HS256_HEADER + b"." + _b64encode(_encode_json(claims).encode())
+        return (signing_input + b"." + _b64encode(self._sign(signing_input))).decode()
+
+    def decode(self, token: str) -> dict[str, Any]:
+        try:
+            signing_input, _, signature = token.encode().rpartition(b".")
+            header, _, payload = signing_input.partition(b".")
+            if header != _HS256_HEADER:
+                if json.loads(_b64decode(header)).get("alg") != JWT_ALGORITHM:
+                    raise InvalidTokenError("Unsupported algorithm")
+
+            if not hmac.compare_digest(self._sign(signing_input), _b64decode(signature)):
+                raise InvalidTokenError("Signature verification failed")
+
+            decoded: Any = json.loads(_b64decode(payload))
+        except (ValueError, AttributeError) as e:
+            raise InvalidTokenError("Malformed token") from e
+
+        if not isinstance(decoded, dict):
+            raise InvalidTokenError("Malformed token")
+
+        claims = cast(dict[str, Any], decoded)
+
+        exp = claims.get("exp")
+        if not isinstance(exp, int) or exp < time.time():
+            raise InvalidTokenError("Token expired")
+
+        return claims
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self.mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+
+def create_token_codec(secret: str) -> TokenCodec:
+    if settings.JWT_BACKEND == "jose":
+        return JoseTokenCodec(secret)
+    return HS256TokenCodec(secret)
+
+
+access_token_codec = create_token_codec(settings.ACCESS_TOKEN_SECRET)
+refresh_token_codec = create_token_codec(settings.REFRESH_TOKEN_SECRET)
+
+
+class TokenCacheStats(TypedDict):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+
+
+# Verified tokens keyed by their SHA-256 digest, least recently used first.
+# An entry is served only until the token's own exp, so caching never
+# extends a token's life; failed verifications are not cached.
+class VerifiedTokenCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries: OrderedDict[bytes, TokenPayload] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest: bytes) -> Optional[TokenPayload]:
+        payload = self.entries.get(digest)
+        if payload is None or payload.exp <= time.time():
+            if payload is not None:
+                del self.entries[digest]
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(digest)
+        self.hits += 1
+        return payload
+
+    def put(self, digest: bytes, payload: TokenPayload) -> None:
+        self.entries[digest] = payload
+        self.entries.move_to_end(digest)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> TokenCacheStats:
+        return TokenCacheStats(
+            size=len(self.entries),
+            max_size=self.max_size,
+            hits=self.hits,
+            misses=self.misses,
+        )
+
+
+access_token_cache = VerifiedTokenCache(ACCESS_TOKEN_CACHE_SIZE)
+
+
 def create_access_token(user_id: str) -> str:
-    payload = {
+    return access_token_codec.encode({
         "sub": user_id,
-        "exp": datetime.now(UTC) + timedelta(seconds=ACCESS_TOKEN_EXPIRE_SECONDS),
-    }
-    return jwt.encode(payload, settings.ACCESS_TOKEN_SECRET, JWT_ALGORITHM)
+        "exp": int(time.time()) + ACCESS_TOKEN_EXPIRE_SECONDS,
+    })
 
 
 def create_refresh_token(user_id: str) -> str:
-    payload = {
+    # jti keeps two tokens issued to a user within the same second distinct,
+    # since their hashes must be unique.
+    return refresh_token_codec.encode({
         "sub": user_id,
-        "exp": datetime.now(UTC) + timedelta(seconds=REFRESH_TOKEN_EXPIRE_SECONDS),
-    }
-    return jwt.encode(payload, settings.REFRESH_TOKEN_SECRET, JWT_ALGORITHM)
+        "exp": int(time.time()) + REFRESH_TOKEN_EXPIRE_SECONDS,
+        "jti": str(uuid.uuid4()),
+    })
+
+
+def _get_token_payload(codec: TokenCodec, token: str) -> TokenPayload:
+    try:
+        return TokenPayload(**codec.decode(token))
+    except ValidationError as e:
+        raise InvalidTokenError("Invalid token claims") from e
 
 
 def verify_access_token(token: str) -> TokenPayload:
-    payload = jwt.decode(
-        token,
-        settings.ACCESS_TOKEN_SECRET,
-        algorithms=[JWT_ALGORITHM],
-    )
-    return TokenPayload(**payload)
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = access_token_cache.get(digest)
+    if cached is not None:
+        return cached
+
+    token_payload = _get_token_payload(access_token_codec, token)
+    access_token_cache.put(digest, token_payload)
+    return token_payload
 
 
 def verify_refresh_token(token: str) -> TokenPayload:
-    payload = jwt.decode(
-        token,
-        settings.REFRESH_TOKEN_SECRET,
-        algorithms=[JWT_ALGORITHM],
-    )
-    return TokenPayload(**payload)
+    return _get_token_payload(refresh_token_codec, token)
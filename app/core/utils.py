@@ -2,6 +2,8 @@ from typing import Any
 
 from typing_extensions import Optional
 
+from app.core.constants import MESSAGE_PREVIEW_LENGTH
+
 
 def get_sanitized_str(data: Any, key: str) -> Optional[str]:
     value = data.get(key)
@@ -15,3 +17,6 @@ def get_sanitized_bool(data: Any, key: str) -> Optional[bool]:
     if not isinstance(value, bool):
         return None
     return value
+
+def get_message_preview(content: str) -> str:
+    return content[:MESSAGE_PREVIEW_LENGTH]
@@ -1,47 +1,171 @@
 import asyncio
-from typing import Dict, Set
+import importlib
+import json
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Dict, FrozenSet, Set
 
 from fastapi import WebSocket
 
+from app.core.constants import (
+    WS_ROOM_LOCK_SHARDS,
+    WS_SEND_QUEUE_SIZE,
+    WS_SEND_TIMEOUT_SECONDS,
+    WS_TRY_AGAIN_LATER,
+)
+from app.core.pubsub import PubSubBackend, create_pubsub_backend
 from app.core.schema import WSMessage
 
 
+def _load_frame_encoder() -> Callable[[WSMessage], str]:
+    try:
+        orjson = importlib.import_module("orjson")
+    except ImportError:
+        return json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+    return lambda message: orjson.dumps(message).decode()
+
+
+# Broadcasts are serialized once per event and the resulting text frame is
+# shared by every socket (and every worker) that receives it.
+encode_frame = _load_frame_encoder()
+
+
+# Outbound queue drained by a dedicated writer task, so a slow socket only
+# delays its own frames instead of the whole broadcast.
+class SocketOutbox:
+    def __init__(
+        self,
+        websocket: WebSocket,
+        on_failure: Callable[[WebSocket], Awaitable[None]],
+    ):
+        self.websocket = websocket
+        self.on_failure = on_failure
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=WS_SEND_QUEUE_SIZE)
+        self.task = asyncio.create_task(self._run())
+
+    def push(self, frame: str) -> bool:
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def close(self):
+        if self.task is not asyncio.current_task():
+            self.task.cancel()
+
+    async def _run(self):
+        while True:
+            frame = await self.queue.get()
+            try:
+                await asyncio.wait_for(
+                    self.websocket.send_text(frame),
+                    timeout=WS_SEND_TIMEOUT_SECONDS,
+                )
+            except Exception:
+                await self.on_failure(self.websocket)
+                return
+
+
+# Rooms are copy-on-write: membership changes swap in a new frozenset, so
+# broadcasts read a consistent snapshot without taking any lock. Connects
+# and disconnects only serialize per room shard, around backend
+# (un)subscription.
 class ConnectionManager:
-    def __init__(self):
-        self.rooms: Dict[str, Set[WebSocket]] = {}
-        self.lock = asyncio.Lock()
+    def __init__(self, backend: PubSubBackend):
+        self.rooms: Dict[str, FrozenSet[WebSocket]] = {}
+        self.socket_rooms: Dict[WebSocket, Set[str]] = {}
+        self.outboxes: Dict[WebSocket, SocketOutbox] = {}
+        self.closing: Set[asyncio.Task[None]] = set()
+        self.locks = [asyncio.Lock() for _ in range(WS_ROOM_LOCK_SHARDS)]
+        self.backend = backend
+
+    async def start(self):
+        await self.backend.start(self._deliver)
+
+    async def stop(self):
+        for outbox in self.outboxes.values():
+            outbox.close()
+        self.outboxes.clear()
+        await self.backend.stop()
 
     async def connect(self, websocket: WebSocket, room: str):
-        async with self.lock:
-            self.rooms.setdefault(room, set()).add(websocket)
+        async with self._room_lock(room):
+            if room not in self.rooms:
+                await self.backend.subscribe(room)
+            self.rooms[room] = self.rooms.get(room, frozenset()) | {websocket}
+
+        self.socket_rooms.setdefault(websocket, set()).add(room)
+        if websocket not in self.outboxes:
+            self.outboxes[websocket] = SocketOutbox(websocket, self._evict)
 
     async def disconnect(self, websocket: WebSocket, room: str):
-        async with self.lock:
-            if room in self.rooms:
-                self.rooms[room].discard(websocket)
-                if not self.rooms[room]:
-                    del self.rooms[room]
+        async with self._room_lock(room):
+            await self._remove(websocket, room)
 
     async def broadcast(self, room: str, message: WSMessage):
-        async with self.lock:
-            sockets = list(self.rooms.get(room, []))
+        await self.broadcast_frame(room, encode_frame(message))
 
-        dead_sockets: list[WebSocket] = []
+    async def broadcast_many(self, rooms: Iterable[str], message: WSMessage):
+        frame = encode_frame(message)
+        for room in rooms:
+            await self.broadcast_frame(room, frame)
 
-        for ws in sockets:
-            try:
-                await ws.send_json(message)
-            except Exception:
-                dead_sockets.append(ws)
+    async def broadcast_frame(self, room: str, frame: str):
+        await self.backend.publish(room, frame)
+
+    async def _deliver(self, room: str, frame: str):
+        overflowed: list[WebSocket] = []
+
+        for ws in self.rooms.get(room, ()):
+            outbox = self.outboxes.get(ws)
+            if outbox and not outbox.push(frame):
+                overflowed.append(ws)
+
+        for ws in overflowed:
+            await self._evict(ws)
+
+    # Drops a socket that cannot keep up (full queue, failed or timed out
+    # send) from all of its rooms and closes it in the background.
+    async def _evict(self, websocket: WebSocket):
+        for room in list(self.socket_rooms.get(websocket, [])):
+            async with self._room_lock(room):
+                await self._remove(websocket, room)
+
+        task = asyncio.create_task(self._close(websocket))
+        self.closing.add(task)
+        task.add_done_callback(self.closing.discard)
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(
+                websocket.close(code=WS_TRY_AGAIN_LATER),
+                timeout=WS_SEND_TIMEOUT_SECONDS,
+            )
+        except Exception:
+            pass
+
+    def _room_lock(self, room: str) -> asyncio.Lock:
+        return self.locks[hash(room) % len(self.locks)]
 
-        if dead_sockets:
-            async with self.lock:
-                for ws in dead_sockets:
-                    if room in self.rooms:
-                        self.rooms[room].discard(ws)
-                        if not self.rooms[room]:
-                            del self.rooms[room]
+    async def _remove(self, websocket: WebSocket, room: str):
+        sockets = self.rooms.get(room)
+        if sockets is not None and websocket in sockets:
+            remaining = sockets - {websocket}
+            if remaining:
+                self.rooms[room] = remaining
+            else:
+                del self.rooms[room]
+                await self.backend.unsubscribe(room)
 
+        rooms = self.socket_rooms.get(websocket)
+        if rooms is not None:
+            rooms.discard(room)
+            if not rooms:
+                del self.socket_rooms[websocket]
+                outbox = self.outboxes.pop(websocket, None)
+                if outbox:
+                    outbox.close()
 
 
-ws_manager = ConnectionManager()
+ws_manager = ConnectionManager(create_pubsub_backend())
@@ -1,7 +1,7 @@
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -15,6 +15,15 @@ if TYPE_CHECKING:
 
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        Index(
+            "ix_conversations_inbox",
+            "user_id",
+            "last_message_at",
+            "id",
+            postgresql_where=text("closed_at IS NULL"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True)
 
@@ -44,6 +53,26 @@ class Conversation(Base):
         DateTime(timezone=True),
     )
 
+    # Denormalized from messages and maintained on every write, so the inbox
+    # can be listed by activity without touching the messages table.
+    last_message_id: Mapped[Optional[str]] = mapped_column(String)
+    last_message_preview: Mapped[Optional[str]] = mapped_column(String)
+    last_message_sender_actor_id: Mapped[Optional[str]] = mapped_column(String)
+    last_message_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+    )
+    message_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+    )
+    unread_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+    )
+
     visitor: Mapped["Visitor"] = relationship(back_populates="conversations")
     user: Mapped["User"] = relationship(back_populates="conversations")
     widget: Mapped["Widget"] = relationship(back_populates="conversations")
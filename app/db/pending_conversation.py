@@ -1,7 +1,7 @@
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import DateTime, ForeignKey, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -14,6 +14,15 @@ if TYPE_CHECKING:
 
 class PendingConversation(Base):
     __tablename__ = "pending_conversations"
+    __table_args__ = (
+        Index(
+            "ix_pending_conversations_queue",
+            "widget_id",
+            "created_at",
+            "id",
+            postgresql_where=text("closed_at IS NULL AND accepted_at IS NULL"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True)
 
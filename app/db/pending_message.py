@@ -1,7 +1,7 @@
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import DateTime, ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -11,12 +11,19 @@ if TYPE_CHECKING:
 
 class PendingMessage(Base):
     __tablename__ = "pending_messages"
+    __table_args__ = (
+        Index(
+            "ix_pending_messages_pending_conversation_id_created_at_id",
+            "pending_conversation_id",
+            "created_at",
+            "id",
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True)
 
     pending_conversation_id: Mapped[str] = mapped_column(
         ForeignKey("pending_conversations.id", ondelete="CASCADE"),
-        index=True,
     )
 
     sender_visitor_id: Mapped[str] = mapped_column(
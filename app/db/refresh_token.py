@@ -25,7 +25,7 @@ class RefreshToken(Base):
         index=True,
     )
 
-    refresh_token_hash: Mapped[str]
+    refresh_token_hash: Mapped[str] = mapped_column(String, unique=True, index=True)
     is_revoked: Mapped[bool] = mapped_column(Boolean, default=False)
     expires_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -8,7 +8,7 @@ from app.features.user.service import UserService
 
 
 def get_auth_service(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     user_service: UserService = Depends(get_user_service),
 ) -> AuthService:
     return AuthService(db, user_service)
@@ -6,41 +6,42 @@ from jose import jwt
 from app.core.config import settings
 from app.core.constants import GOOGLE_OAUTH_CERTS_URL, GOOGLE_OAUTH_TOKEN_URL
 from app.features.auth.exceptions import OAuthExchangeError, TokenVerificationError
+from app.features.auth.jwks import JWKSCache
 from app.features.auth.schema import GooglePayload, GoogleTokenResponse
 
+google_jwks = JWKSCache(GOOGLE_OAUTH_CERTS_URL)
 
-async def exchange_code_for_id_token(code: str) -> GoogleTokenResponse:
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.post(
-                GOOGLE_OAUTH_TOKEN_URL,
-                data={
-                    "client_id": settings.GOOGLE_CLIENT_ID,
-                    "client_secret": settings.GOOGLE_CLIENT_SECRET,
-                    "code": code,
-                    "grant_type": "authorization_code",
-                    "redirect_uri": settings.GOOGLE_REDIRECT_URI,
-                },
-                timeout=10.0,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            return GoogleTokenResponse(**data)
-
-        except Exception as e:
-            logging.error(f"Error exchanging code for token: {e}", exc_info=True)
-            raise OAuthExchangeError("Failed to exchange code for token") from e
+
+async def exchange_code_for_id_token(
+    client: httpx.AsyncClient,
+    code: str,
+) -> GoogleTokenResponse:
+    try:
+        resp = await client.post(
+            GOOGLE_OAUTH_TOKEN_URL,
+            data={
+                "client_id": settings.GOOGLE_CLIENT_ID,
+                "client_secret": settings.GOOGLE_CLIENT_SECRET,
+                "code": code,
+                "grant_type": "authorization_code",
+                "redirect_uri": settings.GOOGLE_REDIRECT_URI,
+            },
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        return GoogleTokenResponse(**data)
+
+    except Exception as e:
+        logging.error(f"Error exchanging code for token: {e}", exc_info=True)
+        raise OAuthExchangeError("Failed to exchange code for token") from e
 
 
 async def verify_google_id_token(id_token: str, access_token: str) -> GooglePayload:
     try:
-        async with httpx.AsyncClient() as client:
-            certs_resp = await client.get(GOOGLE_OAUTH_CERTS_URL, timeout=10.0)
-            certs_resp.raise_for_status()
-            certs_json = certs_resp.json()
-
         header = jwt.get_unverified_header(id_token)
-        key = next(k for k in certs_json["keys"] if k["kid"] == header["kid"])
+        key = await google_jwks.get_key(header["kid"])
+        if key is None:
+            raise TokenVerificationError(f"Unknown signing key {header['kid']}")
 
         payload = jwt.decode(
             id_token,
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.constants import (
+    JWKS_DEFAULT_MAX_AGE_SECONDS,
+    JWKS_MIN_REFRESH_INTERVAL_SECONDS,
+    JWKS_REFRESH_MARGIN_SECONDS,
+)
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+def _get_max_age(cache_control: Optional[str]) -> float:
+    match = _MAX_AGE.search(cache_control or "")
+    return float(match.group(1)) if match else JWKS_DEFAULT_MAX_AGE_SECONDS
+
+
+# Signing keys published at a JWKS endpoint, indexed by kid. The key set is
+# kept for as long as the response's Cache-Control max-age allows and is
+# refreshed in the background shortly before that, so logins normally never
+# wait on the endpoint. An unknown kid (the provider rotated its keys early)
+# triggers an immediate refetch, at most once per minimum interval.
+class JWKSCache:
+    def __init__(self, url: str):
+        self.url = url
+        self.keys: Dict[str, Dict[str, Any]] = {}
+        self.expires_at = 0.0
+        self.fetched_at = float("-inf")
+        self.lock = asyncio.Lock()
+        self.client: Optional[httpx.AsyncClient] = None
+        self.task: Optional[asyncio.Task[None]] = None
+
+    # The client is owned by the caller and must outlive the cache.
+    async def start(self, client: httpx.AsyncClient) -> None:
+        self.client = client
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        self.client = None
+
+    async def get_key(self, kid: str) -> Optional[Dict[str, Any]]:
+        key = self.keys.get(kid)
+        if key is not None and time.monotonic() < self.expires_at:
+            return key
+
+        await self.refresh(force=key is None)
+        return self.keys.get(kid)
+
+    # Concurrent callers share one fetch. Without force, a key set that is
+    # still fresh is kept; with force, it is only kept if it was fetched
+    # within the minimum interval.
+    async def refresh(self, force: bool = False) -> None:
+        async with self.lock:
+            now = time.monotonic()
+            if now < self.expires_at and not force:
+                return
+            if now - self.fetched_at < JWKS_MIN_REFRESH_INTERVAL_SECONDS:
+                return
+
+            self.fetched_at = now
+            try:
+                await self._fetch()
+            except Exception:
+                # Keys already held stay usable until a fetch succeeds.
+                logging.exception(f"Failed to fetch JWKS from {self.url}")
+
+    async def _fetch(self) -> None:
+        if self.client is None:
+            raise RuntimeError("JWKS cache is not started")
+
+        resp = await self.client.get(self.url)
+        resp.raise_for_status()
+        keys = resp.json()["keys"]
+
+        self.keys = {key["kid"]: key for key in keys}
+        self.expires_at = time.monotonic() + _get_max_age(resp.headers.get("cache-control"))
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh(force=True)
+            delay = self.expires_at - JWKS_REFRESH_MARGIN_SECONDS - time.monotonic()
+            await asyncio.sleep(max(delay, JWKS_MIN_REFRESH_INTERVAL_SECONDS))
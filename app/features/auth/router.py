@@ -1,11 +1,13 @@
 from typing import Optional
 from urllib.parse import urlencode
 
+import httpx
 from fastapi import APIRouter, Cookie, Depends, HTTPException, Response, status
 from fastapi.responses import JSONResponse, RedirectResponse
 
 from app.core.config import settings
 from app.core.constants import GOOGLE_OAUTH_AUTH_URL
+from app.core.http import get_http_client
 from app.core.security import get_current_user_id
 from app.features.auth.dependencies import get_auth_service
 from app.features.auth.exceptions import (
@@ -41,9 +43,10 @@ async def google_callback(
     response: Response,
     code: str,
     auth_service: AuthService = Depends(get_auth_service),
+    http_client: httpx.AsyncClient = Depends(get_http_client),
 ):
     try:
-        token_data = await exchange_code_for_id_token(code)
+        token_data = await exchange_code_for_id_token(http_client, code)
 
         payload = await verify_google_id_token(
             token_data.id_token, token_data.access_token,
@@ -1,13 +1,13 @@
 import hashlib
 import uuid
-from datetime import UTC, datetime
+from typing import Optional
 
 from fastapi import Response
-from sqlalchemy import select, update
+from sqlalchemy import func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.constants import ACCESS_TOKEN_EXPIRE_SECONDS, REFRESH_TOKEN_EXPIRE_SECONDS
-from app.core.tokens import create_access_token, create_refresh_token
+from app.core.tokens import InvalidTokenError, create_access_token, create_refresh_token
 from app.core.tokens import verify_refresh_token as decode_refresh_token
 from app.db.refresh_token import RefreshToken
 from app.features.auth.exceptions import AuthServiceError, InvalidRefreshTokenError
@@ -40,26 +40,23 @@ class AuthService:
         try:
             token_hash = self._get_token_hash(refresh_token)
 
-            token_payload = decode_refresh_token(refresh_token)
+            try:
+                token_payload = decode_refresh_token(refresh_token)
+            except InvalidTokenError as e:
+                raise InvalidRefreshTokenError("Refresh token invalid") from e
             user_id = token_payload.sub
 
-            is_token_valid = await self._verify_refresh_token(
+            revoked_user_id = await self._revoke_refresh_token(
                 user_id=user_id,
                 token_hash=token_hash,
             )
-            if not is_token_valid:
+            if revoked_user_id is None:
                 raise InvalidRefreshTokenError("Refresh token invalid")
 
-            token_pair = self._generate_token_pair(user_id)
-
-            await self.db.execute(
-                update(RefreshToken)
-                .where(RefreshToken.refresh_token_hash == token_hash)
-                .values(is_revoked=True),
-            )
+            token_pair = self._generate_token_pair(revoked_user_id)
 
             await self._save_refresh_token(
-                user_id=user_id,
+                user_id=revoked_user_id,
                 refresh_token=token_pair.refresh_token,
             )
 
@@ -72,21 +69,14 @@ class AuthService:
         try:
             token_hash = self._get_token_hash(refresh_token)
 
-            is_token_valid = await self._verify_refresh_token(
+            revoked_user_id = await self._revoke_refresh_token(
                 user_id=user_id,
                 token_hash=token_hash,
                 verify_expiry=False,
             )
-            if not is_token_valid:
+            if revoked_user_id is None:
                 raise InvalidRefreshTokenError("Refresh token invalid")
 
-            await self.db.execute(
-                update(RefreshToken)
-                .where(RefreshToken.refresh_token_hash == token_hash)
-                .values(is_revoked=True),
-            )
-            await self.db.commit()
-
         except InvalidRefreshTokenError:
             raise
 
@@ -96,7 +86,6 @@ class AuthService:
             .where(RefreshToken.user_id == user_id)
             .values(is_revoked=True),
         )
-        await self.db.commit()
 
     def set_token_cookie(self, response: Response, refresh_token: str, access_token: str) -> None:
         response.set_cookie(
@@ -160,7 +149,7 @@ class AuthService:
             )
 
             self.db.add(new_refresh_token)
-            await self.db.commit()
+            await self.db.flush()
 
         except Exception as e:
             raise AuthServiceError("Error saving refresh token") from e
@@ -168,27 +157,27 @@ class AuthService:
     def _get_token_hash(self, token: str) -> str:
         return hashlib.sha256(token.encode()).hexdigest()
 
-    async def _verify_refresh_token(
+    # Revokes the token in a single conditional UPDATE and returns its owner,
+    # or None when it is unknown, already revoked or (unless verify_expiry
+    # is off) expired. Concurrent attempts on the same token serialize on
+    # the row lock, so only one of them can succeed.
+    async def _revoke_refresh_token(
         self,
         user_id: str,
         token_hash: str,
         verify_expiry: bool = True,
-    ) -> bool:
-        token_obj_query = await self.db.execute(
-            select(RefreshToken).where(
-                (RefreshToken.refresh_token_hash == token_hash)
-                & (RefreshToken.user_id == user_id)
-                & (~RefreshToken.is_revoked),
-            ),
+    ) -> Optional[str]:
+        stmt = (
+            update(RefreshToken)
+            .where(
+                RefreshToken.refresh_token_hash == token_hash,
+                RefreshToken.user_id == user_id,
+                ~RefreshToken.is_revoked,
+            )
+            .values(is_revoked=True)
+            .returning(RefreshToken.user_id)
         )
-        token_obj = token_obj_query.scalar_one_or_none()
-
-        if not token_obj:
-            return False
-
-        is_expired = token_obj.expires_at <= datetime.now(UTC)
-
-        if verify_expiry and is_expired:
-            return False
+        if verify_expiry:
+            stmt = stmt.where(RefreshToken.expires_at > func.now())
 
-        return True
+        return await self.db.scalar(stmt)
@@ -1,11 +1,21 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.features.conversation.service import ConversationService
+from app.features.widget.dependencies import get_widget_service
+from app.features.widget.service import WidgetService
 
 
 def get_conversation_service(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
+    widget_service: WidgetService = Depends(get_widget_service),
 ) -> ConversationService:
-    return ConversationService(db)
+    return ConversationService(db, widget_service)
+
+
+def get_read_conversation_service(
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+    widget_service: WidgetService = Depends(get_widget_service),
+) -> ConversationService:
+    return ConversationService(db, widget_service)
@@ -1,7 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
 
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.core.constants import CONVERSATION_PAGE_SIZE, CONVERSATION_PAGE_SIZE_MAX
+from app.core.pagination import InvalidCursorError
 from app.core.security import get_current_user_id
-from app.features.conversation.dependencies import get_conversation_service
+from app.features.conversation.dependencies import (
+    get_conversation_service,
+    get_read_conversation_service,
+)
 from app.features.conversation.exceptions import (
     ConversationAlreadyExistsError,
     ConversationAuthorizationError,
@@ -10,8 +17,8 @@ from app.features.conversation.exceptions import (
 )
 from app.features.conversation.schema import (
     ConversationCreate,
+    ConversationPage,
     ConversationRead,
-    ConversationReadWithLatestMessage,
 )
 from app.features.conversation.service import ConversationService
 
@@ -32,7 +39,7 @@ async def create_conversation(
             pending_conversation_id=payload.pending_conversation_id,
             user_id=user_id,
         )
-        await conversation_service.broadcast_conv_created(conv)
+        conversation_service.broadcast_conv_created(conv)
         return conv
 
     except ConversationAlreadyExistsError:
@@ -47,16 +54,61 @@ async def create_conversation(
             detail="Pending Conversation not found",
         )
 
+@router.post(
+    "/claim",
+    response_model=ConversationRead,
+    status_code=status.HTTP_201_CREATED,
+)
+async def claim_next_conversation(
+    project_id: Optional[str] = Query(None),
+    widget_id: Optional[str] = Query(None),
+    conversation_service: ConversationService = Depends(get_conversation_service),
+    user_id: str = Depends(get_current_user_id),
+):
+    try:
+        conv = await conversation_service.claim_next_pending_conversation(
+            user_id=user_id,
+            project_id=project_id,
+            widget_id=widget_id,
+        )
+        conversation_service.broadcast_conv_created(conv)
+        return conv
+
+    except PendingConversationNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No pending conversation to claim",
+        )
+
 @router.get(
     "",
-    response_model=list[ConversationReadWithLatestMessage],
+    response_model=ConversationPage,
     status_code=status.HTTP_200_OK,
 )
 async def list_conversations(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(CONVERSATION_PAGE_SIZE, ge=1, le=CONVERSATION_PAGE_SIZE_MAX),
+    conversation_service: ConversationService = Depends(get_read_conversation_service),
+    user_id: str = Depends(get_current_user_id),
+):
+    try:
+        return await conversation_service.list_conversations(user_id, cursor, limit)
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+@router.post(
+    "/{conversation_id}/read",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def mark_conversation_read(
+    conversation_id: str,
     conversation_service: ConversationService = Depends(get_conversation_service),
     user_id: str = Depends(get_current_user_id),
 ):
-    return await conversation_service.list_conversations(user_id)
+    try:
+        await conversation_service.mark_conversation_read(conversation_id, user_id)
+    except ConversationNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
 
 @router.post(
     "/{conversation_id}/close",
@@ -70,7 +122,7 @@ async def close_conversation(
 ):
     try:
         conv = await conversation_service.close_conversation(conversation_id, user_id)
-        await conversation_service.broadcast_conv_closed(conv)
+        conversation_service.broadcast_conv_closed(conv)
         return conv
     except ConversationNotFoundError:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
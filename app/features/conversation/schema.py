@@ -31,3 +31,11 @@ class ConversationMessageRead(BaseModel):
 
 class ConversationReadWithLatestMessage(ConversationRead):
     latest_message: Optional[ConversationMessageRead]
+    last_message_at: datetime
+    message_count: int
+    unread_count: int
+
+
+class ConversationPage(BaseModel):
+    items: list[ConversationReadWithLatestMessage]
+    next_cursor: Optional[str]
@@ -2,15 +2,33 @@ import uuid
 from datetime import UTC, datetime
 from typing import Optional
 
-from sqlalchemy import desc, insert, select
+from sqlalchemy import (
+    ColumnElement,
+    String,
+    cast,
+    desc,
+    func,
+    insert,
+    literal,
+    select,
+    tuple_,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
+from app.core.config import settings
+from app.core.constants import CONVERSATION_PAGE_SIZE, MESSAGE_PREVIEW_LENGTH
+from app.core.database import after_commit
+from app.core.pagination import decode_cursor, encode_cursor
 from app.core.websocket_manager import ws_manager
 from app.db.conversation import Conversation
 from app.db.message import Message
 from app.db.pending_conversation import PendingConversation
+from app.db.pending_message import PendingMessage
+from app.db.project import Project
 from app.db.visitor import Visitor
+from app.db.widget import Widget
 from app.features.conversation.exceptions import (
     ConversationAlreadyExistsError,
     ConversationAuthorizationError,
@@ -20,38 +38,126 @@ from app.features.conversation.exceptions import (
 )
 from app.features.conversation.schema import (
     ConversationMessageRead,
+    ConversationPage,
     ConversationReadWithLatestMessage,
 )
+from app.features.conversation.typing import TypingCoalescer
 from app.features.visitor.schema import VisitorRead
+from app.features.widget.service import WidgetService
+
+
+async def _publish_typing_status(conversation_id: str, client_id: str, status: bool) -> None:
+    await ws_manager.broadcast(
+        f"conversation:{conversation_id}",
+        {
+            "type": "conversation.typing",
+            "payload": {
+                "client_id": client_id,
+                "status": status,
+            },
+        },
+    )
+
+
+typing_coalescer = TypingCoalescer(
+    window=settings.TYPING_COALESCE_WINDOW_SECONDS,
+    publish=_publish_typing_status,
+)
 
 
 class ConversationService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, widget_service: WidgetService):
         self.db = db
+        self.widget_service = widget_service
 
+    # Accepts a specific pending conversation. The claim is a single
+    # conditional UPDATE, so of several agents accepting at once exactly one
+    # gets the row and the others fail before doing any other work.
     async def create_from_pending(
         self,
         pending_conversation_id: str,
         user_id: str,
     ) -> Conversation:
-        result = await self.db.execute(
-            select(PendingConversation)
+        pending_conv = await self._claim_pending_conversation(
+            PendingConversation.id == pending_conversation_id,
+        )
+        if not pending_conv:
+            if await self._pending_conversation_exists(pending_conversation_id):
+                raise ConversationAlreadyExistsError()
+            raise PendingConversationNotFoundError()
+
+        return await self._promote(pending_conv, user_id)
+
+    # Dispatches the longest waiting pending conversation on the user's
+    # widgets, optionally narrowed to a project or widget. Agents pull work
+    # when they are available; SKIP LOCKED lets concurrent callers claim
+    # different conversations instead of contending for the head of the
+    # queue.
+    async def claim_next_pending_conversation(
+        self,
+        user_id: str,
+        project_id: Optional[str] = None,
+        widget_id: Optional[str] = None,
+    ) -> Conversation:
+        owned_widgets = (
+            select(Widget.id)
+            .join(Project, Widget.project_id == Project.id)
             .where(
-                PendingConversation.id == pending_conversation_id,
-                PendingConversation.closed_at.is_(None),
+                Widget.deleted_at.is_(None),
+                Project.owner_id == user_id,
+                Project.deleted_at.is_(None),
             )
-            .options(selectinload(PendingConversation.pending_messages)),
         )
 
-        pending_conv = result.scalar_one_or_none()
+        if project_id is not None:
+            owned_widgets = owned_widgets.where(Widget.project_id == project_id)
+
+        if widget_id is not None:
+            owned_widgets = owned_widgets.where(Widget.id == widget_id)
+
+        pending_conv = await self._claim_pending_conversation(
+            PendingConversation.widget_id.in_(owned_widgets),
+        )
         if not pending_conv:
             raise PendingConversationNotFoundError()
 
-        if pending_conv.accepted_at is not None:
-            raise ConversationAlreadyExistsError()
+        return await self._promote(pending_conv, user_id)
+
+    # Marks the oldest matching open pending conversation as accepted and
+    # returns it, or None when there is nothing left to claim. Rows being
+    # claimed by another transaction are skipped rather than waited on.
+    async def _claim_pending_conversation(
+        self,
+        *criteria: ColumnElement[bool],
+    ) -> Optional[PendingConversation]:
+        candidate = (
+            select(PendingConversation.id)
+            .where(
+                PendingConversation.closed_at.is_(None),
+                PendingConversation.accepted_at.is_(None),
+                *criteria,
+            )
+            .order_by(PendingConversation.created_at, PendingConversation.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
 
-        pending_conv.accepted_at = datetime.now(UTC)
+        return await self.db.scalar(
+            update(PendingConversation)
+            .where(
+                PendingConversation.id == candidate,
+                PendingConversation.accepted_at.is_(None),
+            )
+            .values(accepted_at=datetime.now(UTC))
+            .returning(PendingConversation)
+            .execution_options(populate_existing=True, synchronize_session=False),
+        )
 
+    # Turns a claimed pending conversation into a conversation in the same
+    # transaction as the claim. The pending messages are copied server-side
+    # with INSERT ... SELECT.
+    async def _promote(self, pending_conv: PendingConversation, user_id: str) -> Conversation:
         visitor = await self.db.get(Visitor, pending_conv.visitor_id)
         if not visitor:
             raise ConversationServiceError()
@@ -62,30 +168,81 @@ class ConversationService:
             user_id=user_id,
             pending_conversation_id=pending_conv.id,
             widget_id=pending_conv.widget_id,
+            last_message_at=pending_conv.accepted_at,
         )
         self.db.add(new_conversation)
-        await self.db.commit()
-        await self.db.refresh(new_conversation)
+        await self.db.flush()
 
-        new_conversation.visitor = visitor
+        # Returns the updated conversation, refreshing its summary in place.
+        await self.db.scalar(
+            self._copy_pending_messages(new_conversation, pending_conv.id, visitor.actor_id),
+        )
 
-        messages_payload = [
-            {
-                "id": str(uuid.uuid4()),
-                "conversation_id": new_conversation.id,
-                "sender_actor_id": visitor.actor_id,
-                "content": msg.content,
-            }
-            for msg in pending_conv.pending_messages
-        ]
+        new_conversation.visitor = visitor
 
-        if messages_payload:
-            await self.db.execute(insert(Message), messages_payload)
+        return new_conversation
 
-        await self.db.commit()
+    # Copies the pending messages, keeping their timestamps, and seeds the
+    # conversation summary from them in the same statement. All copied
+    # messages start out unread.
+    def _copy_pending_messages(
+        self,
+        conversation: Conversation,
+        pending_conversation_id: str,
+        sender_actor_id: str,
+    ):
+        copied = (
+            insert(Message)
+            .from_select(
+                ["id", "conversation_id", "sender_actor_id", "content", "created_at"],
+                select(
+                    cast(func.gen_random_uuid(), String),
+                    literal(conversation.id),
+                    literal(sender_actor_id),
+                    PendingMessage.content,
+                    PendingMessage.created_at,
+                ).where(PendingMessage.pending_conversation_id == pending_conversation_id),
+            )
+            .returning(
+                Message.id,
+                Message.conversation_id,
+                Message.content,
+                Message.created_at,
+            )
+            .cte("copied")
+        )
+        latest = (
+            select(copied.c.id, copied.c.conversation_id, copied.c.content, copied.c.created_at)
+            .order_by(copied.c.created_at.desc(), copied.c.id.desc())
+            .limit(1)
+            .subquery("latest")
+        )
+        count = select(func.count()).select_from(copied).scalar_subquery()
 
-        return new_conversation
+        return (
+            update(Conversation)
+            .add_cte(copied)
+            .where(Conversation.id == latest.c.conversation_id)
+            .values(
+                last_message_id=latest.c.id,
+                last_message_preview=func.left(latest.c.content, MESSAGE_PREVIEW_LENGTH),
+                last_message_sender_actor_id=sender_actor_id,
+                last_message_at=latest.c.created_at,
+                message_count=count,
+                unread_count=count,
+            )
+            .returning(Conversation)
+            .execution_options(populate_existing=True, synchronize_session=False)
+        )
 
+    async def _pending_conversation_exists(self, pending_conversation_id: str) -> bool:
+        result = await self.db.execute(
+            select(PendingConversation.id).where(
+                PendingConversation.id == pending_conversation_id,
+                PendingConversation.closed_at.is_(None),
+            ),
+        )
+        return result.scalar_one_or_none() is not None
 
     async def get_conversation(self, conversation_id: str) -> Optional[Conversation]:
         result = await self.db.execute(
@@ -100,46 +257,41 @@ class ConversationService:
         )
         return result.scalars().first()
 
+    # Open conversations by most recent activity, newest first. Keyset
+    # paginated over (last_message_at, id), which the partial inbox index
+    # serves as a single range scan; the latest message comes from the
+    # conversation's own summary, so the messages table is never read.
     async def list_conversations(
         self,
         user_id: str,
-    ) -> list[ConversationReadWithLatestMessage]:
-        latest_message_subq = (
-            select(
-                Message.conversation_id,
-                Message.id.label("latest_message_id"),
-                Message.content.label("latest_message_content"),
-                Message.sender_actor_id.label("latest_message_sender_actor_id"),
-                Message.created_at.label("latest_message_created_at"),
-            )
-            .where(Message.conversation_id == Conversation.id)
-            .order_by(desc(Message.created_at))
-            .limit(1)
-            .correlate(Conversation)
-            .lateral()
-        )
-
+        cursor: Optional[str] = None,
+        limit: int = CONVERSATION_PAGE_SIZE,
+    ) -> ConversationPage:
         stmt = (
-            select(
-                Conversation,
-                latest_message_subq.c.latest_message_id,
-                latest_message_subq.c.latest_message_content,
-                latest_message_subq.c.latest_message_sender_actor_id,
-                latest_message_subq.c.latest_message_created_at,
-            )
+            select(Conversation)
             .where(
                 Conversation.user_id == user_id,
                 Conversation.closed_at.is_(None),
             )
-            .join(latest_message_subq, isouter=True)
-            .options(selectinload(Conversation.visitor))
+            .options(joinedload(Conversation.visitor))
+            .order_by(desc(Conversation.last_message_at), desc(Conversation.id))
+            .limit(limit + 1)
         )
 
+        if cursor is not None:
+            stmt = stmt.where(
+                tuple_(Conversation.last_message_at, Conversation.id)
+                < tuple_(*decode_cursor(cursor)),
+            )
+
         result = await self.db.execute(stmt)
-        rows = result.all()
+        conversations = list(result.scalars().all())
+
+        has_more = len(conversations) > limit
+        conversations = conversations[:limit]
 
         conversation_with_latest_message: list[ConversationReadWithLatestMessage] = []
-        for conv, msg_id, msg_content, msg_sender, msg_created_at in rows:
+        for conv in conversations:
             conversation_with_latest_message.append(
                 ConversationReadWithLatestMessage(
                     id=conv.id,
@@ -149,16 +301,38 @@ class ConversationService:
                         display_id=conv.visitor.display_id,
                     ),
                     latest_message=ConversationMessageRead(
-                        id=msg_id,
-                        content=msg_content,
-                        sender_actor_id=msg_sender,
-                        created_at=msg_created_at,
-                    ) if msg_id else None,
+                        id=conv.last_message_id,
+                        content=conv.last_message_preview or "",
+                        sender_actor_id=conv.last_message_sender_actor_id or "",
+                        created_at=conv.last_message_at,
+                    ) if conv.last_message_id else None,
+                    last_message_at=conv.last_message_at,
+                    message_count=conv.message_count,
+                    unread_count=conv.unread_count,
                 ),
             )
 
-        return conversation_with_latest_message
+        last = conversations[-1] if conversations else None
+
+        return ConversationPage(
+            items=conversation_with_latest_message,
+            next_cursor=(
+                encode_cursor(last.last_message_at, last.id) if last and has_more else None
+            ),
+        )
 
+    async def mark_conversation_read(self, conversation_id: str, user_id: str) -> None:
+        result = await self.db.execute(
+            update(Conversation)
+            .where(
+                Conversation.id == conversation_id,
+                Conversation.user_id == user_id,
+            )
+            .values(unread_count=0)
+            .returning(Conversation.id),
+        )
+        if result.scalar_one_or_none() is None:
+            raise ConversationNotFoundError()
 
     async def close_conversation(self, conversation_id: str, user_id: str) -> Conversation:
         conversation = await self.get_conversation(conversation_id)
@@ -169,42 +343,57 @@ class ConversationService:
             raise ConversationAuthorizationError()
 
         conversation.closed_at = datetime.now(UTC)
-        await self.db.commit()
-        await self.db.refresh(conversation)
+        await self.db.flush()
         return conversation
 
-    async def broadcast_conv_created(self, conv: Conversation) -> None:
-        await ws_manager.broadcast(
-            f"visitor:{conv.visitor_id}",
-            {
-                "type": "conversation.created",
-                "payload": {
-                    "conversation_id": conv.id,
+    # Event broadcasts are deferred until the unit of work commits, so
+    # receivers never see a change they cannot read yet.
+    def broadcast_conv_created(self, conv: Conversation) -> None:
+        async def publish() -> None:
+            await ws_manager.broadcast(
+                f"visitor:{conv.visitor_id}",
+                {
+                    "type": "conversation.created",
+                    "payload": {
+                        "conversation_id": conv.id,
+                    },
                 },
-            },
-        )
-        await ws_manager.broadcast(
-            "conversation:global",
-            {
-                "type": "conversation.created",
-                "payload": {
-                    "conversation_id": conv.id,
-                    "conversation_visitor_id": conv.visitor.id,
-                    "conversation_visitor_display_id": conv.visitor.display_id,
+            )
+            rooms = await self.widget_service.get_broadcast_rooms(
+                "conversation",
+                conv.widget_id,
+            )
+            await ws_manager.broadcast_many(
+                rooms,
+                {
+                    "type": "conversation.created",
+                    "payload": {
+                        "conversation_id": conv.id,
+                        "conversation_visitor_id": conv.visitor.id,
+                        "conversation_visitor_display_id": conv.visitor.display_id,
+                    },
                 },
-            },
-        )
+            )
 
-    async def broadcast_conv_closed(self, conv: Conversation) -> None:
-        await ws_manager.broadcast(
-            "conversation:global",
-            {
-                "type": "conversation.closed",
-                "payload": {
-                    "conversation_id": conv.id,
+        after_commit(self.db, publish)
+
+    def broadcast_conv_closed(self, conv: Conversation) -> None:
+        async def publish() -> None:
+            rooms = await self.widget_service.get_broadcast_rooms(
+                "conversation",
+                conv.widget_id,
+            )
+            await ws_manager.broadcast_many(
+                rooms,
+                {
+                    "type": "conversation.closed",
+                    "payload": {
+                        "conversation_id": conv.id,
+                    },
                 },
-            },
-        )
+            )
+
+        after_commit(self.db, publish)
 
     async def broadcast_client_online_status(
         self,
@@ -229,13 +418,7 @@ class ConversationService:
         client_id: str,
         status: bool,
     ) -> None:
-        await ws_manager.broadcast(
-            f"conversation:{conversation_id}",
-            {
-                "type": "conversation.typing",
-                "payload": {
-                    "client_id": client_id,
-                    "status": status,
-                },
-            },
-        )
+        await typing_coalescer.update(conversation_id, client_id, status)
+
+    async def clear_client_typing_status(self, conversation_id: str, client_id: str) -> None:
+        await typing_coalescer.clear(conversation_id, client_id)
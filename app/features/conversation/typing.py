@@ -0,0 +1,71 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Dict, Optional, Tuple
+
+TypingPublisher = Callable[[str, str, bool], Awaitable[None]]
+
+
+class TypingState:
+    def __init__(self):
+        self.sent = False
+        self.sent_at = float("-inf")
+        self.pending: Optional[bool] = None
+        self.flush_task: Optional[asyncio.Task[None]] = None
+
+
+# Collapses typing updates per (conversation, client) into at most one
+# broadcast per window. Updates matching the last broadcast state are
+# dropped; the latest state within a window is sent when it closes.
+class TypingCoalescer:
+    def __init__(self, window: float, publish: TypingPublisher):
+        self.window = window
+        self.publish = publish
+        self.states: Dict[Tuple[str, str], TypingState] = {}
+
+    async def update(self, conversation_id: str, client_id: str, is_typing: bool) -> None:
+        key = (conversation_id, client_id)
+        state = self.states.setdefault(key, TypingState())
+        state.pending = is_typing
+
+        if state.flush_task:
+            return
+
+        if is_typing == state.sent:
+            state.pending = None
+            return
+
+        delay = state.sent_at + self.window - asyncio.get_running_loop().time()
+        if delay <= 0:
+            await self._flush(key, state)
+        else:
+            state.flush_task = asyncio.create_task(self._flush_later(key, state, delay))
+
+    async def clear(self, conversation_id: str, client_id: str) -> None:
+        state = self.states.pop((conversation_id, client_id), None)
+        if not state:
+            return
+
+        if state.flush_task:
+            state.flush_task.cancel()
+
+        if state.sent:
+            await self.publish(conversation_id, client_id, False)
+
+    async def _flush(self, key: Tuple[str, str], state: TypingState) -> None:
+        is_typing = state.pending
+        state.pending = None
+        if is_typing is None or is_typing == state.sent:
+            return
+
+        state.sent = is_typing
+        state.sent_at = asyncio.get_running_loop().time()
+        await self.publish(key[0], key[1], is_typing)
+
+    async def _flush_later(self, key: Tuple[str, str], state: TypingState, delay: float) -> None:
+        await asyncio.sleep(delay)
+        state.flush_task = None
+        try:
+            await self._flush(key, state)
+        except Exception:
+            logging.exception(f"Failed to publish typing status for {key}")
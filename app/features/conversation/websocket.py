@@ -1,20 +1,23 @@
 from json import JSONDecodeError
+from typing import Optional
 
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from app.core.constants import WS_POLICY_VIOLATION
+from app.core.database import session_scope
+from app.core.schema import WSMessage
 from app.core.security import get_current_user_id_ws
 from app.core.utils import get_sanitized_bool, get_sanitized_str
 from app.core.websocket_manager import ws_manager
 from app.features.conversation.dependencies import get_conversation_service
-from app.features.conversation.service import ConversationService
 from app.features.message.dependencies import get_message_service
 from app.features.message.exceptions import MessageAuthorizationError
-from app.features.message.service import MessageService
+from app.features.widget.dependencies import get_widget_service
 
 router = APIRouter()
 
-# This endpoint is only used to connect an admin to global room.
+# This endpoint is only used to connect an admin to the room of the widgets
+# they own, optionally narrowed down with "project_id" or "widget_id".
 @router.websocket("/ws/conversation")
 async def admin_conversation_ws(websocket: WebSocket):
     await websocket.accept()
@@ -23,7 +26,17 @@ async def admin_conversation_ws(websocket: WebSocket):
         await websocket.close(code=WS_POLICY_VIOLATION)
         return None
 
-    room = "conversation:global"
+    async with session_scope() as db:
+        room = await get_widget_service(db).get_subscription_room(
+            topic="conversation",
+            user_id=user_id,
+            project_id=websocket.query_params.get("project_id"),
+            widget_id=websocket.query_params.get("widget_id"),
+        )
+    if not room:
+        await websocket.close(code=WS_POLICY_VIOLATION)
+        return None
+
     await ws_manager.connect(websocket, room)
 
     try:
@@ -37,12 +50,12 @@ async def admin_conversation_ws(websocket: WebSocket):
 
 # This endpoint is used to establish direct connection between
 # an admin and a visitor, for some conversation_id.
+# Database sessions are borrowed per frame (see session_scope), so an idle
+# socket does not hold on to a pooled connection.
 @router.websocket("/ws/conversation/{conversation_id}")
 async def conversation_ws(
     websocket: WebSocket,
     conversation_id: str,
-    conversation_service: ConversationService = Depends(get_conversation_service),
-    message_service: MessageService = Depends(get_message_service),
 ):
     await websocket.accept()
 
@@ -56,14 +69,26 @@ async def conversation_ws(
     client_id = user_id or visitor_id
     assert client_id is not None
 
+    # Resolved once per connection. Every send re-checks that the conversation
+    # is still open (on both the direct and the write-behind path), and the
+    # first rejection after it closes drops the cached sender for good.
+    async with session_scope() as db:
+        sender = await get_message_service(db).get_sender(
+            conversation_id=conversation_id,
+            user_id=user_id,
+            visitor_id=visitor_id,
+        )
+
     room = f"conversation:{conversation_id}"
     await ws_manager.connect(websocket, room)
 
-    await conversation_service.broadcast_client_online_status(
-        conversation_id=conversation_id,
-        client_id=client_id,
-        status=True,
-    )
+    async with session_scope() as db:
+        conversation_service = get_conversation_service(db, get_widget_service(db))
+        await conversation_service.broadcast_client_online_status(
+            conversation_id=conversation_id,
+            client_id=client_id,
+            status=True,
+        )
 
     try:
         while True:
@@ -77,42 +102,57 @@ async def conversation_ws(
                 continue
 
             message_type = get_sanitized_str(data, "type")
-
-            if message_type == "typing":
-                is_typing = get_sanitized_bool(data, "is_typing")
-                if is_typing is not None:
-                    await conversation_service.broadcast_client_typing_status(
-                        conversation_id=conversation_id,
-                        client_id=client_id,
-                        status=is_typing,
-                    )
-
-            if message_type == "send-message":
-                try:
-                    msg_content = get_sanitized_str(data, "message")
-                    if not msg_content:
-                        continue
-
-                    new_msg = await message_service.create_message(
-                        conversation_id=conversation_id,
-                        user_id=user_id,
-                        visitor_id=visitor_id,
-                        content=msg_content,
-                    )
-                    await message_service.broadcast_msg_created(new_msg)
-                except MessageAuthorizationError:
-                    await websocket.send_json({
-                        "type": "error",
-                        "payload": {"message": "Not authorized to send message"},
-                    })
+            reply: Optional[WSMessage] = None
+
+            # Error replies are sent once the frame's unit of work is over, so
+            # no connection is held while writing to the socket.
+            async with session_scope() as db:
+                conversation_service = get_conversation_service(db, get_widget_service(db))
+                message_service = get_message_service(db)
+
+                if message_type == "typing":
+                    is_typing = get_sanitized_bool(data, "is_typing")
+                    if is_typing is not None:
+                        await conversation_service.broadcast_client_typing_status(
+                            conversation_id=conversation_id,
+                            client_id=client_id,
+                            status=is_typing,
+                        )
+
+                if message_type == "send-message":
+                    try:
+                        msg_content = get_sanitized_str(data, "message")
+                        if not msg_content:
+                            continue
+
+                        if sender is None:
+                            raise MessageAuthorizationError()
+
+                        new_msg = await message_service.send_message(sender, msg_content)
+                        message_service.broadcast_msg_created(new_msg)
+                    except MessageAuthorizationError:
+                        sender = None
+                        reply = {
+                            "type": "error",
+                            "payload": {"message": "Not authorized to send message"},
+                        }
+
+            if reply is not None:
+                await websocket.send_json(reply)
 
     except WebSocketDisconnect:
         pass
 
     finally:
         await ws_manager.disconnect(websocket, room)
-        await conversation_service.broadcast_client_online_status(
-            conversation_id=conversation_id,
-            client_id=client_id,
-            status=False,
-        )
+        async with session_scope() as db:
+            conversation_service = get_conversation_service(db, get_widget_service(db))
+            await conversation_service.clear_client_typing_status(
+                conversation_id=conversation_id,
+                client_id=client_id,
+            )
+            await conversation_service.broadcast_client_online_status(
+                conversation_id=conversation_id,
+                client_id=client_id,
+                status=False,
+            )
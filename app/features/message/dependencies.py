@@ -1,9 +1,15 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.features.message.service import MessageService
 
 
-def get_message_service(db: AsyncSession = Depends(get_db)) -> MessageService:
+def get_message_service(db: AsyncSession = Depends(get_db, scope="function")) -> MessageService:
+    return MessageService(db)
+
+
+def get_read_message_service(
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+) -> MessageService:
     return MessageService(db)
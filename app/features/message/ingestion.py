@@ -0,0 +1,234 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    String,
+    case,
+    column,
+    insert,
+    literal,
+    or_,
+    select,
+    update,
+    values,
+)
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.utils import get_message_preview
+from app.core.websocket_manager import ws_manager
+from app.db.conversation import Conversation
+from app.db.message import Message
+from app.features.message.schema import SenderType
+
+
+# Inbox summary columns for a conversation's newest message. They only move
+# forward: a message that commits after a newer one (a late batch from
+# another worker, or a concurrent send) leaves the summary untouched.
+def last_message_values(message: Message) -> dict[str, ColumnElement[Any]]:
+    is_newer = or_(
+        Conversation.last_message_at.is_(None),
+        Conversation.last_message_at <= message.created_at,
+    )
+
+    return {
+        column.key: case((is_newer, literal(value, column.type)), else_=column)
+        for column, value in (
+            (Conversation.last_message_id, message.id),
+            (Conversation.last_message_preview, get_message_preview(message.content)),
+            (Conversation.last_message_sender_actor_id, message.sender_actor_id),
+            (Conversation.last_message_at, message.created_at),
+        )
+    }
+
+
+# Write-behind persistence for chat messages. Messages are handed over
+# already authorized, with their id and timestamp assigned, and are
+# group-committed in batches together with the inbox summary of every
+# conversation involved; once a batch is durable each of them receives a
+# "conversation.message_persisted" acknowledgment, or
+# "conversation.message_failed" if it was dropped (its conversation was
+# closed in the meantime) or the batch could not be written.
+class MessageIngestor:
+    def __init__(self, batch_size: int, batch_interval: float, queue_size: int):
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.queue: asyncio.Queue[Optional[Tuple[Message, SenderType]]] = asyncio.Queue(
+            maxsize=queue_size,
+        )
+        self.task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    async def start(self) -> None:
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if not self.task:
+            return
+
+        await self.queue.put(None)
+        await self.task
+        self.task = None
+
+    # Returns False when the ingestor is not running or is saturated, in
+    # which case the caller should persist the message itself.
+    def submit(self, message: Message, sender_type: SenderType) -> bool:
+        if not self.is_running:
+            return False
+
+        try:
+            self.queue.put_nowait((message, sender_type))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            first = await self.queue.get()
+            if first is None:
+                break
+
+            batch = [first]
+            deadline = loop.time() + self.batch_interval
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except TimeoutError:
+                    break
+
+                if item is None:
+                    stopping = True
+                    break
+
+                batch.append(item)
+
+            await self._persist(batch)
+
+    async def _persist(self, batch: list[Tuple[Message, SenderType]]) -> None:
+        persisted: set[str] = set()
+        try:
+            async with AsyncSessionLocal() as db:
+                persisted = set(await db.scalars(self._batch_insert(batch)))
+
+                by_conversation: defaultdict[str, list[Tuple[Message, SenderType]]] = (
+                    defaultdict(list)
+                )
+                for message, sender_type in batch:
+                    if message.id in persisted:
+                        by_conversation[message.conversation_id].append((message, sender_type))
+
+                for conversation_id, items in by_conversation.items():
+                    await db.execute(self._summary_update(conversation_id, items))
+                await db.commit()
+        except Exception:
+            logging.exception(f"Failed to persist batch of {len(batch)} messages")
+            persisted = set()
+
+        acks: defaultdict[Tuple[str, str], list[str]] = defaultdict(list)
+        for message, _ in batch:
+            event_type = (
+                "conversation.message_persisted"
+                if message.id in persisted
+                else "conversation.message_failed"
+            )
+            acks[(message.conversation_id, event_type)].append(message.id)
+
+        for (conversation_id, event_type), message_ids in acks.items():
+            try:
+                await ws_manager.broadcast(
+                    f"conversation:{conversation_id}",
+                    {
+                        "type": event_type,
+                        "payload": {"message_ids": message_ids},
+                    },
+                )
+            except Exception:
+                logging.exception(f"Failed to acknowledge messages for {conversation_id}")
+
+    # Inserts the batch with INSERT ... SELECT over a VALUES list joined to
+    # the open conversations, so messages for a conversation closed while
+    # they were queued are dropped. Returns the ids actually inserted.
+    def _batch_insert(self, batch: list[Tuple[Message, SenderType]]):
+        rows = values(
+            column("id", String),
+            column("conversation_id", String),
+            column("sender_actor_id", String),
+            column("content", String),
+            column("created_at", DateTime(timezone=True)),
+            name="batch",
+        ).data([
+            (
+                message.id,
+                message.conversation_id,
+                message.sender_actor_id,
+                message.content,
+                message.created_at,
+            )
+            for message, _ in batch
+        ])
+
+        return (
+            insert(Message)
+            .from_select(
+                ["id", "conversation_id", "sender_actor_id", "content", "created_at"],
+                select(
+                    rows.c.id,
+                    rows.c.conversation_id,
+                    rows.c.sender_actor_id,
+                    rows.c.content,
+                    rows.c.created_at,
+                )
+                .join(Conversation, Conversation.id == rows.c.conversation_id)
+                .where(Conversation.closed_at.is_(None)),
+            )
+            .returning(Message.id)
+        )
+
+    # Same rules as the synchronous path: visitor messages add to the unread
+    # count and an agent reply resets it.
+    def _summary_update(self, conversation_id: str, items: list[Tuple[Message, SenderType]]):
+        unread = 0
+        reset = False
+        for _, sender_type in items:
+            if sender_type == "visitor":
+                unread += 1
+            else:
+                unread = 0
+                reset = True
+
+        unread_count: ColumnElement[int] = (
+            literal(unread) if reset else Conversation.unread_count + unread
+        )
+        last_message = max((message for message, _ in items), key=lambda m: m.created_at)
+
+        return (
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(
+                **last_message_values(last_message),
+                message_count=Conversation.message_count + len(items),
+                unread_count=unread_count,
+            )
+        )
+
+
+message_ingestor = MessageIngestor(
+    batch_size=settings.MESSAGE_BATCH_SIZE,
+    batch_interval=settings.MESSAGE_BATCH_INTERVAL_SECONDS,
+    queue_size=settings.MESSAGE_QUEUE_SIZE,
+)
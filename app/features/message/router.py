@@ -1,11 +1,14 @@
-from typing import List
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Path, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi.responses import StreamingResponse
 
+from app.core.constants import MESSAGE_PAGE_SIZE, MESSAGE_PAGE_SIZE_MAX
+from app.core.pagination import InvalidCursorError
 from app.core.security import get_current_user_id
-from app.features.message.dependencies import get_message_service
+from app.features.message.dependencies import get_message_service, get_read_message_service
 from app.features.message.exceptions import MessageAuthorizationError
-from app.features.message.schema import MessageCreate, MessageRead
+from app.features.message.schema import MessageCreate, MessagePage, MessageRead
 from app.features.message.service import MessageService
 
 router = APIRouter()
@@ -29,7 +32,7 @@ async def create_message(
             visitor_id=None,
             content=payload.content,
         )
-        await message_service.broadcast_msg_created(message)
+        message_service.broadcast_msg_created(message)
         return message
     except MessageAuthorizationError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authorized")
@@ -37,19 +40,61 @@ async def create_message(
 
 @router.get(
     "",
-    response_model=List[MessageRead],
+    response_model=MessagePage,
     status_code=status.HTTP_200_OK,
 )
 async def list_messages(
     conversation_id: str = Path(...),
-    message_service: MessageService = Depends(get_message_service),
+    before: Optional[str] = Query(None),
+    after: Optional[str] = Query(None),
+    limit: int = Query(MESSAGE_PAGE_SIZE, ge=1, le=MESSAGE_PAGE_SIZE_MAX),
+    message_service: MessageService = Depends(get_read_message_service),
+    current_user_id: str = Depends(get_current_user_id),
+):
+    if before and after:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only one of before and after can be given",
+        )
+
+    try:
+        page = await message_service.list_messages_by_conversation(
+            conversation_id=conversation_id,
+            user_id=current_user_id,
+            before=before,
+            after=after,
+            limit=limit,
+        )
+        return page
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    except MessageAuthorizationError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authorized")
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def export_messages(
+    conversation_id: str = Path(...),
+    message_service: MessageService = Depends(get_read_message_service),
     current_user_id: str = Depends(get_current_user_id),
 ):
     try:
-        messages = await message_service.list_messages_by_conversation(
+        lines = await message_service.export_messages_by_conversation(
             conversation_id=conversation_id,
             user_id=current_user_id,
         )
-        return messages
+        return StreamingResponse(
+            lines,
+            media_type="application/x-ndjson",
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="conversation-{conversation_id}.ndjson"'
+                ),
+            },
+        )
     except MessageAuthorizationError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authorized")
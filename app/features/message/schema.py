@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Literal, Optional, TypedDict
 
 from pydantic import BaseModel
 
@@ -19,3 +20,18 @@ class MessageRead(MessageBase):
 
     class Config:
         from_attributes = True
+
+
+class MessagePage(BaseModel):
+    items: list[MessageRead]
+    before_cursor: Optional[str]
+    after_cursor: Optional[str]
+
+
+SenderType = Literal["user", "visitor"]
+
+
+class MessageSender(TypedDict):
+    conversation_id: str
+    sender_actor_id: str
+    sender_type: SenderType
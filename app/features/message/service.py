@@ -1,15 +1,28 @@
 import uuid
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import DateTime, desc, insert, literal, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.constants import MESSAGE_EXPORT_BATCH_SIZE, MESSAGE_PAGE_SIZE
+from app.core.database import ReadSessionLocal, after_commit, mark_recent_write
+from app.core.pagination import decode_cursor, encode_cursor
 from app.core.websocket_manager import ws_manager
 from app.db.conversation import Conversation
 from app.db.message import Message
 from app.db.user import User
 from app.db.visitor import Visitor
 from app.features.message.exceptions import MessageAuthorizationError
+from app.features.message.ingestion import last_message_values, message_ingestor
+from app.features.message.schema import (
+    MessagePage,
+    MessageRead,
+    MessageSender,
+    SenderType,
+)
 
 
 class MessageService:
@@ -23,37 +36,137 @@ class MessageService:
         visitor_id: Optional[str],
         content: str,
     ) -> Message:
-        conversation = await self._get_self_conversation(
+        sender = await self.get_sender(
             conversation_id=conversation_id,
             user_id=user_id,
             visitor_id=visitor_id,
         )
 
-        if conversation is None:
+        if sender is None:
             raise MessageAuthorizationError()
 
-        sender_actor_id = await self._get_self_actor_id(
-            user_id=user_id,
-            visitor_id=visitor_id,
+        return await self.send_message(sender, content)
+
+    # Resolves the conversation and actor a participant sends as. The result
+    # stays valid until the conversation is closed, so long-lived connections
+    # can resolve it once and reuse it for every message.
+    async def get_sender(
+        self,
+        conversation_id: str,
+        user_id: Optional[str],
+        visitor_id: Optional[str],
+    ) -> Optional[MessageSender]:
+        if user_id:
+            sender_type: SenderType = "user"
+            stmt = (
+                select(Conversation.id, User.actor_id)
+                .join(User, Conversation.user_id == User.id)
+                .where(User.id == user_id)
+            )
+        elif visitor_id:
+            sender_type = "visitor"
+            stmt = (
+                select(Conversation.id, Visitor.actor_id)
+                .join(Visitor, Conversation.visitor_id == Visitor.id)
+                .where(Visitor.id == visitor_id)
+            )
+        else:
+            return None
+
+        result = await self.db.execute(
+            stmt.where(
+                Conversation.id == conversation_id,
+                Conversation.closed_at.is_(None),
+            ),
+        )
+        row = result.one_or_none()
+        if not row:
+            return None
+
+        return MessageSender(
+            conversation_id=row.id,
+            sender_actor_id=row.actor_id,
+            sender_type=sender_type,
         )
 
+    # Inserts the message only while the conversation is still open, so a
+    # cached sender costs a single statement and is rejected once closed.
+    # The conversation's inbox summary is bumped in the same statement:
+    # visitor messages count as unread, a reply from the agent clears them,
+    # and the last message only moves forward when sends commit out of order.
+    async def send_message(self, sender: MessageSender, content: str) -> Message:
         new_message = Message(
             id=str(uuid.uuid4()),
-            conversation_id=conversation.id,
-            sender_actor_id=sender_actor_id,
+            conversation_id=sender["conversation_id"],
+            sender_actor_id=sender["sender_actor_id"],
             content=content,
+            created_at=datetime.now(UTC),
+        )
+
+        if settings.MESSAGE_WRITE_BEHIND:
+            # The ingestor also drops messages for conversations closed while
+            # they were queued; this check rejects the common case up front.
+            is_open = await self.db.scalar(
+                select(Conversation.id).where(
+                    Conversation.id == sender["conversation_id"],
+                    Conversation.closed_at.is_(None),
+                ),
+            )
+            if is_open is None:
+                raise MessageAuthorizationError()
+
+            if message_ingestor.submit(new_message, sender["sender_type"]):
+                # Nothing is written through this session, so record it here.
+                mark_recent_write()
+                return new_message
+
+        conversation = (
+            update(Conversation)
+            .where(
+                Conversation.id == sender["conversation_id"],
+                Conversation.closed_at.is_(None),
+            )
+            .values(
+                **last_message_values(new_message),
+                message_count=Conversation.message_count + 1,
+                unread_count=(
+                    Conversation.unread_count + 1 if sender["sender_type"] == "visitor" else 0
+                ),
+            )
+            .returning(Conversation.id)
+            .cte("conversation")
+        )
+
+        result = await self.db.execute(
+            insert(Message)
+            .add_cte(conversation)
+            .from_select(
+                ["id", "conversation_id", "sender_actor_id", "content", "created_at"],
+                select(
+                    literal(new_message.id),
+                    conversation.c.id,
+                    literal(new_message.sender_actor_id),
+                    literal(new_message.content),
+                    literal(new_message.created_at, DateTime(timezone=True)),
+                ),
+            )
+            .returning(Message.id),
         )
-        self.db.add(new_message)
-        await self.db.commit()
-        await self.db.refresh(new_message)
+        if result.scalar_one_or_none() is None:
+            raise MessageAuthorizationError()
 
         return new_message
 
+    # Keyset pagination over (created_at, id). Without a cursor the latest
+    # page is returned; items are always in chronological order.
     async def list_messages_by_conversation(
         self,
         conversation_id: str,
         user_id: str,
-    ) -> list[Message]:
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = MESSAGE_PAGE_SIZE,
+    ) -> MessagePage:
         conversation = await self._get_self_conversation(
             conversation_id=conversation_id,
             user_id=user_id,
@@ -63,26 +176,89 @@ class MessageService:
         if conversation is None:
             raise MessageAuthorizationError()
 
-        result = await self.db.execute(
-            select(Message)
-            .where(Message.conversation_id == conversation.id)
-            .order_by(Message.created_at),
+        key = tuple_(Message.created_at, Message.id)
+        stmt = select(Message).where(Message.conversation_id == conversation.id)
+
+        if after is not None:
+            stmt = stmt.where(key > tuple_(*decode_cursor(after)))
+            stmt = stmt.order_by(Message.created_at, Message.id)
+        else:
+            if before is not None:
+                stmt = stmt.where(key < tuple_(*decode_cursor(before)))
+            stmt = stmt.order_by(desc(Message.created_at), desc(Message.id))
+
+        result = await self.db.execute(stmt.limit(limit + 1))
+        messages = list(result.scalars().all())
+
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+
+        if after is None:
+            messages.reverse()
+
+        first = messages[0] if messages else None
+        last = messages[-1] if messages else None
+
+        if after is not None:
+            has_older, has_newer = first is not None, has_more
+        else:
+            has_older, has_newer = has_more, before is not None and last is not None
+
+        return MessagePage(
+            items=[MessageRead.model_validate(message) for message in messages],
+            before_cursor=(
+                encode_cursor(first.created_at, first.id) if first and has_older else None
+            ),
+            after_cursor=(
+                encode_cursor(last.created_at, last.id) if last and has_newer else None
+            ),
+        )
+
+    # Full transcript as NDJSON, one message per line. Rows are read through
+    # a server-side cursor on a dedicated read session (the replica when one
+    # is configured), so memory use does not grow with the conversation.
+    async def export_messages_by_conversation(
+        self,
+        conversation_id: str,
+        user_id: str,
+    ) -> AsyncIterator[str]:
+        conversation = await self._get_self_conversation(
+            conversation_id=conversation_id,
+            user_id=user_id,
+            visitor_id=None,
+            include_closed=True,
         )
-        return list(result.scalars().all())
+
+        if conversation is None:
+            raise MessageAuthorizationError()
+
+        return self._stream_messages(conversation.id)
+
+    async def _stream_messages(self, conversation_id: str) -> AsyncIterator[str]:
+        async with ReadSessionLocal() as db:
+            messages = await db.stream_scalars(
+                select(Message)
+                .where(Message.conversation_id == conversation_id)
+                .order_by(Message.created_at, Message.id)
+                .execution_options(yield_per=MESSAGE_EXPORT_BATCH_SIZE),
+            )
+            async for message in messages:
+                yield MessageRead.model_validate(message).model_dump_json() + "\n"
 
     async def _get_self_conversation(
         self,
         conversation_id: str,
         user_id: Optional[str],
         visitor_id: Optional[str],
+        include_closed: bool = False,
     ) -> Optional[Conversation]:
         if user_id is None and visitor_id is None:
             return None
 
-        stmt = select(Conversation).where(
-            Conversation.id == conversation_id,
-            Conversation.closed_at.is_(None),
-        )
+        stmt = select(Conversation).where(Conversation.id == conversation_id)
+
+        if not include_closed:
+            stmt = stmt.where(Conversation.closed_at.is_(None))
 
         if user_id:
             stmt = stmt.where(Conversation.user_id == user_id)
@@ -93,32 +269,19 @@ class MessageService:
         conversation = result.scalars().one_or_none()
         return conversation
 
-    async def _get_self_actor_id(
-        self,
-        user_id: Optional[str],
-        visitor_id: Optional[str],
-    ) -> Optional[str]:
-        if not (user_id or visitor_id):
-            return None
-
-        if user_id:
-            user = await self.db.get(User, user_id)
-            return user.actor_id if user else None
-
-        visitor = await self.db.get(Visitor, visitor_id)
-        return visitor.actor_id if visitor else None
-
-
-
-    async def broadcast_msg_created(self, msg: Message) -> None:
-        await ws_manager.broadcast(
-            f"conversation:{msg.conversation_id}",
-            {
-                "type": "conversation.message_created",
-                "payload": {
-                    "message_id": msg.id,
-                    "message_sender_actor_id": msg.sender_actor_id,
-                    "message_content": msg.content,
+    # Sent once the unit of work commits (see after_commit).
+    def broadcast_msg_created(self, msg: Message) -> None:
+        async def publish() -> None:
+            await ws_manager.broadcast(
+                f"conversation:{msg.conversation_id}",
+                {
+                    "type": "conversation.message_created",
+                    "payload": {
+                        "message_id": msg.id,
+                        "message_sender_actor_id": msg.sender_actor_id,
+                        "message_content": msg.content,
+                    },
                 },
-            },
-        )
+            )
+
+        after_commit(self.db, publish)
@@ -1,16 +1,23 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.features.pending_conversation.service import (
     PendingConversationService,
 )
-from app.features.visitor.dependencies import get_visitor_service
-from app.features.visitor.service import VisitorService
+from app.features.widget.dependencies import get_widget_service
+from app.features.widget.service import WidgetService
 
 
 def get_pending_conversation_service(
-    db: AsyncSession = Depends(get_db),
-    visitor_service: VisitorService = Depends(get_visitor_service),
+    db: AsyncSession = Depends(get_db, scope="function"),
+    widget_service: WidgetService = Depends(get_widget_service),
 ) -> PendingConversationService:
-    return PendingConversationService(db, visitor_service)
+    return PendingConversationService(db, widget_service)
+
+
+def get_read_pending_conversation_service(
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+    widget_service: WidgetService = Depends(get_widget_service),
+) -> PendingConversationService:
+    return PendingConversationService(db, widget_service)
@@ -1,13 +1,23 @@
-from typing import List
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
+from app.core.constants import (
+    PENDING_CONVERSATION_PAGE_SIZE,
+    PENDING_CONVERSATION_PAGE_SIZE_MAX,
+    PENDING_MESSAGE_PREVIEW_COUNT,
+    PENDING_MESSAGE_PREVIEW_COUNT_MAX,
+)
+from app.core.pagination import InvalidCursorError
 from app.core.security import get_current_user_id as require_admin_user
-from app.features.pending_conversation.dependencies import get_pending_conversation_service
+from app.features.pending_conversation.dependencies import (
+    get_pending_conversation_service,
+    get_read_pending_conversation_service,
+)
 from app.features.pending_conversation.exceptions import PendingConversationServiceError
 from app.features.pending_conversation.schema import (
+    PendingConversationPage,
     PendingConversationRead,
-    PendingConversationReadWithMessages,
 )
 from app.features.pending_conversation.service import (
     PendingConversationService,
@@ -17,15 +27,37 @@ router = APIRouter()
 
 @router.get(
     "",
-    response_model=List[PendingConversationReadWithMessages],
+    response_model=PendingConversationPage,
     status_code=status.HTTP_200_OK,
-    dependencies=[Depends(require_admin_user)],
 )
 async def list_pending_conversations(
-    pc_service: PendingConversationService = Depends(get_pending_conversation_service),
+    project_id: Optional[str] = Query(None),
+    widget_id: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(
+        PENDING_CONVERSATION_PAGE_SIZE,
+        ge=1,
+        le=PENDING_CONVERSATION_PAGE_SIZE_MAX,
+    ),
+    messages: int = Query(
+        PENDING_MESSAGE_PREVIEW_COUNT,
+        ge=0,
+        le=PENDING_MESSAGE_PREVIEW_COUNT_MAX,
+    ),
+    pc_service: PendingConversationService = Depends(get_read_pending_conversation_service),
+    user_id: str = Depends(require_admin_user),
 ):
-    pcs = await pc_service.list_pending_conversations()
-    return pcs
+    try:
+        return await pc_service.list_pending_conversations(
+            user_id=user_id,
+            project_id=project_id,
+            widget_id=widget_id,
+            cursor=cursor,
+            limit=limit,
+            message_count=messages,
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
 
 
 @router.post(
@@ -40,7 +72,7 @@ async def close_pending_conversation(
 ):
     try:
         pc = await pc_service.close_pending_conversation(pc_id)
-        await pc_service.broadcast_pc_closed(pc)
+        pc_service.broadcast_pc_closed(pc)
         return pc
     except PendingConversationServiceError:
         raise HTTPException(
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -30,3 +30,7 @@ class PendingConversationReadWithMessages(BaseModel):
 
     class Config:
         from_attributes = True
+
+class PendingConversationPage(BaseModel):
+    items: List[PendingConversationReadWithMessages]
+    next_cursor: Optional[str]
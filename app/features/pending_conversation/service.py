@@ -1,27 +1,43 @@
 import uuid
 from datetime import UTC, datetime
-from typing import Optional
+from typing import Dict, Optional
 
-from sqlalchemy import select
+from sqlalchemy import DateTime, func, insert, literal, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload
 from sqlalchemy.orm.strategy_options import selectinload
 
+from app.core.constants import PENDING_CONVERSATION_PAGE_SIZE, PENDING_MESSAGE_PREVIEW_COUNT
+from app.core.database import after_commit
+from app.core.pagination import decode_cursor, encode_cursor
 from app.core.websocket_manager import ws_manager
 from app.db.pending_conversation import PendingConversation
 from app.db.pending_message import PendingMessage
+from app.db.project import Project
 from app.db.visitor import Visitor
+from app.db.widget import Widget
 from app.features.pending_conversation.exceptions import (
     InvalidVisitorIDError,
     PendingConversationServiceError,
     PendingMessageAuthorizationError,
 )
-from app.features.visitor.service import VisitorService
+from app.features.pending_conversation.schema import (
+    PendingConversationPage,
+    PendingConversationReadWithMessages,
+    PendingMessageRead,
+)
+from app.features.visitor.schema import VisitorRead
+from app.features.widget.service import WidgetService
 
 
 class PendingConversationService:
-    def __init__(self, db: AsyncSession, visitor_service: VisitorService):
+    def __init__(
+        self,
+        db: AsyncSession,
+        widget_service: WidgetService,
+    ):
         self.db = db
-        self.visitor_service  = visitor_service
+        self.widget_service = widget_service
 
     async def create_or_get_pending_conversation(
         self,
@@ -52,27 +68,119 @@ class PendingConversationService:
             widget_id=widget_id,
         )
         self.db.add(new_pc)
-        await self.db.commit()
-        await self.db.refresh(new_pc)
+        await self.db.flush()
 
         new_pc.visitor = visitor
 
         return new_pc
 
-    async def list_pending_conversations(self) -> list[PendingConversation]:
-        result = await self.db.execute(
+    # The admin queue: open pending conversations on the widgets the user
+    # owns, longest waiting first, keyset paginated over (created_at, id).
+    # Only the latest few messages of each conversation are fetched, ranked
+    # per conversation with a window function in a single query.
+    async def list_pending_conversations(
+        self,
+        user_id: str,
+        project_id: Optional[str] = None,
+        widget_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = PENDING_CONVERSATION_PAGE_SIZE,
+        message_count: int = PENDING_MESSAGE_PREVIEW_COUNT,
+    ) -> PendingConversationPage:
+        stmt = (
             select(PendingConversation)
+            .join(Widget, PendingConversation.widget_id == Widget.id)
+            .join(Project, Widget.project_id == Project.id)
             .where(
                 PendingConversation.closed_at.is_(None),
                 PendingConversation.accepted_at.is_(None),
+                Widget.deleted_at.is_(None),
+                Project.owner_id == user_id,
+                Project.deleted_at.is_(None),
             )
-            .options(
-                selectinload(PendingConversation.pending_messages),
-                selectinload(PendingConversation.visitor),
-            ),
+            .options(joinedload(PendingConversation.visitor))
+            .order_by(PendingConversation.created_at, PendingConversation.id)
+            .limit(limit + 1)
+        )
+
+        if project_id is not None:
+            stmt = stmt.where(Widget.project_id == project_id)
+
+        if widget_id is not None:
+            stmt = stmt.where(PendingConversation.widget_id == widget_id)
+
+        if cursor is not None:
+            stmt = stmt.where(
+                tuple_(PendingConversation.created_at, PendingConversation.id)
+                > tuple_(*decode_cursor(cursor)),
+            )
+
+        result = await self.db.execute(stmt)
+        pending_conversations = list(result.scalars().all())
+
+        has_more = len(pending_conversations) > limit
+        pending_conversations = pending_conversations[:limit]
+
+        pending_messages = await self._get_latest_pending_messages(
+            [pc.id for pc in pending_conversations],
+            message_count,
+        )
+
+        last = pending_conversations[-1] if pending_conversations else None
+
+        return PendingConversationPage(
+            items=[
+                PendingConversationReadWithMessages(
+                    id=pc.id,
+                    created_at=pc.created_at,
+                    pending_messages=[
+                        PendingMessageRead.model_validate(pm)
+                        for pm in pending_messages.get(pc.id, [])
+                    ],
+                    visitor=VisitorRead(
+                        id=pc.visitor.id,
+                        display_id=pc.visitor.display_id,
+                    ),
+                )
+                for pc in pending_conversations
+            ],
+            next_cursor=encode_cursor(last.created_at, last.id) if last and has_more else None,
         )
-        pending_conversations = result.scalars().all()
-        return list(pending_conversations)
+
+    # Newest first, at most `count` per pending conversation.
+    async def _get_latest_pending_messages(
+        self,
+        pc_ids: list[str],
+        count: int,
+    ) -> Dict[str, list[PendingMessage]]:
+        if not pc_ids or count <= 0:
+            return {}
+
+        ranked = (
+            select(
+                PendingMessage,
+                func.row_number()
+                .over(
+                    partition_by=PendingMessage.pending_conversation_id,
+                    order_by=[PendingMessage.created_at.desc(), PendingMessage.id.desc()],
+                )
+                .label("rank"),
+            )
+            .where(PendingMessage.pending_conversation_id.in_(pc_ids))
+            .subquery()
+        )
+        latest = aliased(PendingMessage, ranked)
+
+        result = await self.db.execute(
+            select(latest)
+            .where(ranked.c.rank <= count)
+            .order_by(latest.pending_conversation_id, ranked.c.rank),
+        )
+
+        pending_messages: Dict[str, list[PendingMessage]] = {}
+        for pm in result.scalars():
+            pending_messages.setdefault(pm.pending_conversation_id, []).append(pm)
+        return pending_messages
 
     async def get_pending_conversation(
         self,
@@ -102,68 +210,105 @@ class PendingConversationService:
             raise PendingConversationServiceError()
 
         pc.closed_at = datetime.now(UTC)
-        await self.db.commit()
-        await self.db.refresh(pc)
+        await self.db.flush()
         return pc
 
+    # Inserts the message only while the pending conversation is open, not
+    # yet accepted and owned by the visitor, so a cached pending
+    # conversation costs a single statement and is rejected once stale.
     async def send_pending_message(
         self,
         pc_id: str,
         visitor_id: str,
         content: str,
     ) -> PendingMessage:
-        pc = await self.get_pending_conversation(pc_id=pc_id)
-        if not pc:
-            raise PendingMessageAuthorizationError()
-
-        visitor = await self.visitor_service.get_visitor(visitor_id)
-        if not visitor:
-            raise PendingMessageAuthorizationError()
-
         new_pm = PendingMessage(
             id=str(uuid.uuid4()),
-            pending_conversation_id=pc.id,
-            sender_visitor_id=visitor.id,
+            pending_conversation_id=pc_id,
+            sender_visitor_id=visitor_id,
             content=content,
+            created_at=datetime.now(UTC),
         )
-        self.db.add(new_pm)
-        await self.db.commit()
-        await self.db.refresh(new_pm)
+
+        result = await self.db.execute(
+            insert(PendingMessage)
+            .from_select(
+                ["id", "pending_conversation_id", "sender_visitor_id", "content", "created_at"],
+                select(
+                    literal(new_pm.id),
+                    PendingConversation.id,
+                    PendingConversation.visitor_id,
+                    literal(new_pm.content),
+                    literal(new_pm.created_at, DateTime(timezone=True)),
+                ).where(
+                    PendingConversation.id == pc_id,
+                    PendingConversation.visitor_id == visitor_id,
+                    PendingConversation.closed_at.is_(None),
+                    PendingConversation.accepted_at.is_(None),
+                ),
+            )
+            .returning(PendingMessage.id),
+        )
+        if result.scalar_one_or_none() is None:
+            raise PendingMessageAuthorizationError()
+
         return new_pm
 
-    async def broadcast_pm_created(self, pm: PendingMessage) -> None:
-        await ws_manager.broadcast(
-            "pending_conversation:global",
-            {
-                "type": "pending_message.created",
-                "payload": {
-                    "pending_conversation_id": pm.pending_conversation_id,
-                    "pending_message_id": pm.id,
-                    "pending_message_content": pm.content,
+    # Sent once the unit of work commits (see after_commit).
+    def broadcast_pm_created(self, pm: PendingMessage, widget_id: str) -> None:
+        async def publish() -> None:
+            rooms = await self.widget_service.get_broadcast_rooms(
+                "pending_conversation",
+                widget_id,
+            )
+            await ws_manager.broadcast_many(
+                rooms,
+                {
+                    "type": "pending_message.created",
+                    "payload": {
+                        "pending_conversation_id": pm.pending_conversation_id,
+                        "pending_message_id": pm.id,
+                        "pending_message_content": pm.content,
+                    },
                 },
-            },
-        )
+            )
 
-    async def broadcast_pc_created(self, pc: PendingConversation) -> None:
-        await ws_manager.broadcast(
-            "pending_conversation:global",
-            {
-                "type": "pending_conversation.created",
-                "payload": {
-                    "pending_conversation_id": pc.id,
-                    "visitor_id": pc.visitor_id,
-                    "visitor_display_id": pc.visitor.display_id,
+        after_commit(self.db, publish)
+
+    def broadcast_pc_created(self, pc: PendingConversation) -> None:
+        async def publish() -> None:
+            rooms = await self.widget_service.get_broadcast_rooms(
+                "pending_conversation",
+                pc.widget_id,
+            )
+            await ws_manager.broadcast_many(
+                rooms,
+                {
+                    "type": "pending_conversation.created",
+                    "payload": {
+                        "pending_conversation_id": pc.id,
+                        "visitor_id": pc.visitor_id,
+                        "visitor_display_id": pc.visitor.display_id,
+                    },
                 },
-            },
-        )
+            )
+
+        after_commit(self.db, publish)
 
-    async def broadcast_pc_closed(self, pc: PendingConversation) -> None:
-        await ws_manager.broadcast(
-            "pending_conversation:global",
-            {
-                "type": "pending_conversation.closed",
-                "payload": {
-                    "pending_conversation_id": pc.id,
+    def broadcast_pc_closed(self, pc: PendingConversation) -> None:
+        async def publish() -> None:
+            rooms = await self.widget_service.get_broadcast_rooms(
+                "pending_conversation",
+                pc.widget_id,
+            )
+            await ws_manager.broadcast_many(
+                rooms,
+                {
+                    "type": "pending_conversation.closed",
+                    "payload": {
+                        "pending_conversation_id": pc.id,
+                    },
                 },
-            },
-        )
+            )
+
+        after_commit(self.db, publish)
@@ -2,12 +2,15 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from app.core.constants import WS_POLICY_VIOLATION
+from app.core.database import session_scope
 from app.core.security import get_current_user_id_ws
 from app.core.websocket_manager import ws_manager
+from app.features.widget.dependencies import get_widget_service
 
 router = APIRouter()
 
-# This endpoint is only used to connect an admin to global room.
+# This endpoint is only used to connect an admin to the room of the widgets
+# they own, optionally narrowed down with "project_id" or "widget_id".
 @router.websocket("/ws/pending-conversation")
 async def admin_pending_conversation_ws(websocket: WebSocket):
     await websocket.accept()
@@ -16,7 +19,17 @@ async def admin_pending_conversation_ws(websocket: WebSocket):
         await websocket.close(code=WS_POLICY_VIOLATION)
         return None
 
-    room = "pending_conversation:global"
+    async with session_scope() as db:
+        room = await get_widget_service(db).get_subscription_room(
+            topic="pending_conversation",
+            user_id=user_id,
+            project_id=websocket.query_params.get("project_id"),
+            widget_id=websocket.query_params.get("widget_id"),
+        )
+    if not room:
+        await websocket.close(code=WS_POLICY_VIOLATION)
+        return None
+
     await ws_manager.connect(websocket, room)
 
     try:
@@ -5,5 +5,5 @@ from app.core.database import get_db
 from app.features.project.service import ProjectService
 
 
-def get_project_service(db: AsyncSession = Depends(get_db)) -> ProjectService:
+def get_project_service(db: AsyncSession = Depends(get_db, scope="function")) -> ProjectService:
     return ProjectService(db)
@@ -28,9 +28,7 @@ class ProjectService:
         )
 
         self.db.add(project)
-
-        await self.db.commit()
-        await self.db.refresh(project)
+        await self.db.flush()
         return project
 
     async def get_project(
@@ -80,9 +78,7 @@ class ProjectService:
         if new_title:
             project.title = new_title
         project.description = new_description
-
-        await self.db.commit()
-        await self.db.refresh(project)
+        await self.db.flush()
         return project
 
     async def delete_project(
@@ -101,5 +97,3 @@ class ProjectService:
             .where(Widget.project_id == project_id)
             .values(deleted_at = now),
         )
-
-        await self.db.commit()
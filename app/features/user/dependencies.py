@@ -5,5 +5,5 @@ from app.core.database import get_db
 from app.features.user.service import UserService
 
 
-def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
+def get_user_service(db: AsyncSession = Depends(get_db, scope="function")) -> UserService:
     return UserService(db)
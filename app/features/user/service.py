@@ -63,8 +63,7 @@ class UserService:
             )
 
             self.db.add(new_user)
-            await self.db.commit()
-            await self.db.refresh(new_user)
+            await self.db.flush()
 
             return UserWithStatus(user=new_user, is_new=True)
 
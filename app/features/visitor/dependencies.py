@@ -1,9 +1,15 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.features.visitor.service import VisitorService
 
 
-def get_visitor_service(db: AsyncSession = Depends(get_db)) -> VisitorService:
+def get_visitor_service(db: AsyncSession = Depends(get_db, scope="function")) -> VisitorService:
+    return VisitorService(db)
+
+
+def get_read_visitor_service(
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+) -> VisitorService:
     return VisitorService(db)
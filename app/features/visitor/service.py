@@ -29,15 +29,15 @@ class VisitorService:
                 name=name,
                 email=email,
             )
-            self.db.add(new_visitor)
 
+            # A display_id collision only rolls back to the savepoint, keeping
+            # the actor and the rest of the unit of work.
             try:
-                await self.db.flush()
-                await self.db.refresh(new_visitor)
+                async with self.db.begin_nested():
+                    self.db.add(new_visitor)
                 return new_visitor
 
             except IntegrityError as e:
-                await self.db.rollback()
                 attempt += 1
 
                 if attempt >= MAX_RETRIES:
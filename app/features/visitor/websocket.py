@@ -1,9 +1,14 @@
 from json import JSONDecodeError
+from typing import Optional, Tuple
 
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from app.core.database import session_scope
+from app.core.schema import WSMessage
 from app.core.utils import get_sanitized_str
 from app.core.websocket_manager import ws_manager
+from app.db.pending_conversation import PendingConversation
+from app.db.visitor import Visitor
 from app.features.pending_conversation.dependencies import get_pending_conversation_service
 from app.features.pending_conversation.exceptions import (
     InvalidVisitorIDError,
@@ -11,20 +16,30 @@ from app.features.pending_conversation.exceptions import (
 )
 from app.features.pending_conversation.service import PendingConversationService
 from app.features.visitor.dependencies import get_visitor_service
-from app.features.visitor.service import VisitorService
+from app.features.widget.dependencies import get_widget_service
 
 router = APIRouter()
 
+
+# Held for the life of a visitor socket, so sending a pending message does
+# not look the visitor or their pending conversation up again. Once the
+# cached pending conversation is closed or accepted, the next send looks it
+# up again (see _send_pending_message).
+class VisitorSocketState:
+    def __init__(self, visitor: Visitor, widget_id: str):
+        self.visitor = visitor
+        self.widget_id = widget_id
+        self.pending_conversation: Optional[PendingConversation] = None
+
+
 # This endpoint is used to:
 # 1. Create a visitor on connection
 # 2. Create a pending conversation (on event "create")
 # 3. Create a pending message (on event "send-pending-message")
+# Database sessions are borrowed per frame (see session_scope), so an idle
+# socket does not hold on to a pooled connection.
 @router.websocket("/ws/visitor")
-async def visitor_ws(
-    websocket: WebSocket,
-    visitor_service: VisitorService = Depends(get_visitor_service),
-    pc_service: PendingConversationService = Depends(get_pending_conversation_service),
-):
+async def visitor_ws(websocket: WebSocket):
     await websocket.accept()
 
     visitor_id = websocket.query_params.get("visitor_id")
@@ -38,27 +53,30 @@ async def visitor_ws(
         await websocket.close()
         return
 
-    if not visitor_id:
-        visitor = await visitor_service.create_visitor(name=None, email=None)
-        visitor_id = visitor.id
-        await websocket.send_json({
-            "type": "visitor.created",
-            "payload": {"visitor_id": visitor_id, "visitor_actor_id": visitor.actor_id},
-        })
-    else:
-        visitor = await visitor_service.get_visitor(visitor_id)
-        if not visitor:
-            await websocket.send_json({
-                "type": "error",
-                "payload": {"message": "Invalid visitor ID"},
-            })
-            await websocket.close()
-            return
+    async with session_scope() as db:
+        visitor_service = get_visitor_service(db)
+        if not visitor_id:
+            visitor = await visitor_service.create_visitor(name=None, email=None)
+            event_type = "visitor.created"
+        else:
+            visitor = await visitor_service.get_visitor(visitor_id)
+            event_type = "visitor.found"
+
+    if not visitor:
         await websocket.send_json({
-            "type": "visitor.found",
-            "payload": {"visitor_id": visitor_id, "visitor_actor_id": visitor.actor_id},
+            "type": "error",
+            "payload": {"message": "Invalid visitor ID"},
         })
+        await websocket.close()
+        return
 
+    visitor_id = visitor.id
+    await websocket.send_json({
+        "type": event_type,
+        "payload": {"visitor_id": visitor_id, "visitor_actor_id": visitor.actor_id},
+    })
+
+    state = VisitorSocketState(visitor, widget_id)
     room = f"visitor:{visitor_id}"
     await ws_manager.connect(websocket, room)
 
@@ -75,65 +93,107 @@ async def visitor_ws(
 
             message_type = get_sanitized_str(data, "type")
 
-            if message_type == "create":
-                try:
-                    pc = await pc_service.create_or_get_pending_conversation(
-                        visitor_id=visitor_id,
-                        widget_id=widget_id,
+            # The reply and the cached pending conversation are only applied
+            # once the frame's unit of work has committed and its broadcasts
+            # have gone out, so the sender hears "created" no earlier than
+            # the other subscribers, is never acked for something that was
+            # rolled back, and no connection is held while writing to it.
+            async with session_scope() as db:
+                pc_service = get_pending_conversation_service(db, get_widget_service(db))
+
+                if message_type == "create":
+                    reply, pending_conversation = await _create_pending_conversation(
+                        pc_service,
+                        state,
                     )
-                    await pc_service.broadcast_pc_created(pc)
-                    await websocket.send_json({
-                        "type": "pending_conversation.created",
-                        "payload": {
-                            "pending_conversation_id": pc.id,
-                            "visitor_id": visitor_id,
-                            "visitor_display_id": pc.visitor.display_id,
-                        },
-                    })
-                except InvalidVisitorIDError:
-                    await websocket.send_json({
-                        "type": "error",
-                        "payload": {"message": "Unable to initiate conversation"},
-                    })
-                    continue
-
-            elif message_type == "send-pending-message":
-                msg_content = get_sanitized_str(data, "message")
-                if msg_content is None:
-                    continue
-
-                pc = await pc_service.get_pending_conversation(visitor_id=visitor_id)
-                if not pc:
-                    await websocket.send_json({
-                        "type": "error",
-                        "payload": {"message": "No pending conversation found"},
-                    })
-                    continue
-
-                try:
-                    pm = await pc_service.send_pending_message(
-                        visitor_id=visitor_id,
-                        content=msg_content,
-                        pc_id=pc.id,
+                elif message_type == "send-pending-message":
+                    msg_content = get_sanitized_str(data, "message")
+                    if msg_content is None:
+                        continue
+                    reply, pending_conversation = await _send_pending_message(
+                        pc_service,
+                        state,
+                        msg_content,
                     )
-                    await pc_service.broadcast_pm_created(pm)
-                    await websocket.send_json({
-                        "type": "pending_message.created",
-                        "payload": {"pending_message_id": pm.id},
-                    })
-                except PendingMessageAuthorizationError:
-                    await websocket.send_json({
-                        "type": "error",
-                        "payload": {"message": "Invalid pending conversation ID"},
-                    })
-                    continue
-            else:
-                await websocket.send_json({
-                    "type": "error",
-                    "payload": {"message": f"Unknown message type: {message_type}"},
-                })
+                else:
+                    reply = _error(f"Unknown message type: {message_type}")
+                    pending_conversation = state.pending_conversation
+
+            state.pending_conversation = pending_conversation
+            await websocket.send_json(reply)
 
     except WebSocketDisconnect:
         pass
     finally:
         await ws_manager.disconnect(websocket, room)
+
+
+def _error(message: str) -> WSMessage:
+    return {"type": "error", "payload": {"message": message}}
+
+
+async def _create_pending_conversation(
+    pc_service: PendingConversationService,
+    state: VisitorSocketState,
+) -> Tuple[WSMessage, Optional[PendingConversation]]:
+    try:
+        pc = await pc_service.create_or_get_pending_conversation(
+            visitor_id=state.visitor.id,
+            widget_id=state.widget_id,
+        )
+    except InvalidVisitorIDError:
+        return _error("Unable to initiate conversation"), state.pending_conversation
+
+    pc_service.broadcast_pc_created(pc)
+    reply: WSMessage = {
+        "type": "pending_conversation.created",
+        "payload": {
+            "pending_conversation_id": pc.id,
+            "visitor_id": state.visitor.id,
+            "visitor_display_id": pc.visitor.display_id,
+        },
+    }
+    return reply, pc
+
+
+# A cached pending conversation may have been accepted or closed since it
+# was cached; the message is then retried once against a fresh lookup
+# before it is rejected.
+async def _send_pending_message(
+    pc_service: PendingConversationService,
+    state: VisitorSocketState,
+    content: str,
+) -> Tuple[WSMessage, Optional[PendingConversation]]:
+    pc = state.pending_conversation
+    if pc is not None:
+        try:
+            return await _create_pending_message(pc_service, state, pc, content), pc
+        except PendingMessageAuthorizationError:
+            pass
+
+    pc = await pc_service.get_pending_conversation(visitor_id=state.visitor.id)
+    if pc is None:
+        return _error("No pending conversation found"), None
+
+    try:
+        return await _create_pending_message(pc_service, state, pc, content), pc
+    except PendingMessageAuthorizationError:
+        return _error("Invalid pending conversation ID"), None
+
+
+async def _create_pending_message(
+    pc_service: PendingConversationService,
+    state: VisitorSocketState,
+    pc: PendingConversation,
+    content: str,
+) -> WSMessage:
+    pm = await pc_service.send_pending_message(
+        visitor_id=state.visitor.id,
+        content=content,
+        pc_id=pc.id,
+    )
+    pc_service.broadcast_pm_created(pm, pc.widget_id)
+    return {
+        "type": "pending_message.created",
+        "payload": {"pending_message_id": pm.id},
+    }
@@ -5,5 +5,5 @@ from app.core.database import get_db
 from app.features.widget.service import WidgetService
 
 
-def get_widget_service(db: AsyncSession = Depends(get_db)) -> WidgetService:
+def get_widget_service(db: AsyncSession = Depends(get_db, scope="function")) -> WidgetService:
     return WidgetService(db)
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, TypedDict
 
 from pydantic import BaseModel, Field, HttpUrl, field_validator
 
@@ -34,3 +34,8 @@ class WidgetOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+class WidgetScope(TypedDict):
+    widget_id: str
+    project_id: str
+    owner_id: str
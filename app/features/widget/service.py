@@ -1,14 +1,24 @@
 from datetime import UTC, datetime
-from typing import Optional
+from typing import Dict, Optional
 from uuid import UUID, uuid4
 
 from pydantic import HttpUrl
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.constants import WIDGET_SCOPE_CACHE_SIZE
 from app.db.project import Project
 from app.db.widget import Widget
 from app.features.widget.exceptions import WidgetAccessDeniedError, WidgetNotFoundError
+from app.features.widget.schema import WidgetScope
+
+# A widget never moves between projects and a project never changes owner,
+# so scopes can be cached for the life of the process.
+_widget_scope_cache: Dict[str, WidgetScope] = {}
+
+
+def _get_room(topic: str, scope: str, scope_id: str) -> str:
+    return f"{topic}:{scope}:{scope_id}"
 
 
 class WidgetService:
@@ -45,8 +55,7 @@ class WidgetService:
         )
 
         self.db.add(widget)
-        await self.db.commit()
-        await self.db.refresh(widget)
+        await self.db.flush()
         return widget
 
 
@@ -104,9 +113,7 @@ class WidgetService:
         if new_title:
             widget.title = new_title
         widget.description = new_description
-
-        await self.db.commit()
-        await self.db.refresh(widget)
+        await self.db.flush()
         return widget
 
     async def delete_widget(
@@ -119,4 +126,68 @@ class WidgetService:
             raise WidgetNotFoundError()
 
         widget.deleted_at = datetime.now(UTC)
-        await self.db.commit()
+        await self.db.flush()
+
+    async def get_widget_scope(self, widget_id: str) -> Optional[WidgetScope]:
+        scope = _widget_scope_cache.get(widget_id)
+        if scope:
+            return scope
+
+        result = await self.db.execute(
+            select(Widget.project_id, Project.owner_id)
+            .join(Project, Widget.project_id == Project.id)
+            .where(Widget.id == widget_id),
+        )
+        row = result.one_or_none()
+        if not row:
+            return None
+
+        if len(_widget_scope_cache) >= WIDGET_SCOPE_CACHE_SIZE:
+            del _widget_scope_cache[next(iter(_widget_scope_cache))]
+
+        scope = WidgetScope(
+            widget_id=widget_id,
+            project_id=row.project_id,
+            owner_id=row.owner_id,
+        )
+        _widget_scope_cache[widget_id] = scope
+        return scope
+
+    # Rooms an event about the widget is published to: one per level an
+    # admin can subscribe at.
+    async def get_broadcast_rooms(self, topic: str, widget_id: str) -> list[str]:
+        scope = await self.get_widget_scope(widget_id)
+        if not scope:
+            return []
+
+        return [
+            _get_room(topic, "owner", scope["owner_id"]),
+            _get_room(topic, "project", scope["project_id"]),
+            _get_room(topic, "widget", scope["widget_id"]),
+        ]
+
+    # Room an admin socket joins; narrowed to a widget or project when
+    # requested, provided the admin owns it.
+    async def get_subscription_room(
+        self,
+        topic: str,
+        user_id: str,
+        project_id: Optional[str],
+        widget_id: Optional[str],
+    ) -> Optional[str]:
+        if widget_id:
+            widget = await self.get_widget(widget_id, user_id)
+            return _get_room(topic, "widget", widget.id) if widget else None
+
+        if project_id:
+            result = await self.db.execute(
+                select(Project.id).where(
+                    Project.id == project_id,
+                    Project.owner_id == user_id,
+                    Project.deleted_at.is_(None),
+                ),
+            )
+            project = result.scalar_one_or_none()
+            return _get_room(topic, "project", project) if project else None
+
+        return _get_room(topic, "owner", user_id)
@@ -1,5 +1,6 @@
 import logging
 from contextlib import asynccontextmanager
+from typing import Any
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -7,10 +8,15 @@ from fastapi.responses import JSONResponse
 
 import app.db.models  # type: ignore
 from app.core.config import settings
-from app.core.database import engine
+from app.core.database import dispose_engine, engine, get_pool_stats, replica_engine
+from app.core.http import http_client
+from app.core.tokens import access_token_cache
+from app.core.websocket_manager import ws_manager
+from app.features.auth.google_oauth import google_jwks
 from app.features.auth.router import router as auth_router
 from app.features.conversation.router import router as conversation_router
 from app.features.conversation.websocket import router as admin_conversation_ws_router
+from app.features.message.ingestion import message_ingestor
 from app.features.message.router import router as message_router
 from app.features.pending_conversation.router import (
     router as pending_conversation_router,
@@ -37,11 +43,33 @@ async def lifespan(_app: FastAPI):
         logging.exception("Database connection failed")
         raise
 
+    await ws_manager.start()
+    logging.info("WebSocket manager started")
+
+    await http_client.start()
+    logging.info("HTTP client started")
+
+    await google_jwks.start(http_client.get())
+    logging.info("Google JWKS refresh started")
+
+    if settings.MESSAGE_WRITE_BEHIND:
+        await message_ingestor.start()
+        logging.info("Message ingestor started")
+
     yield
 
     logging.info("Shutting down application")
-    await engine.dispose()
-    logging.info("Database engine disposed")
+    if settings.MESSAGE_WRITE_BEHIND:
+        await message_ingestor.stop()
+        logging.info("Message ingestor stopped")
+    await ws_manager.stop()
+    logging.info("WebSocket manager stopped")
+    await google_jwks.stop()
+    logging.info("Google JWKS refresh stopped")
+    await http_client.stop()
+    logging.info("HTTP client closed")
+    await dispose_engine()
+    logging.info("Database engines disposed")
 
 
 app = FastAPI(
@@ -97,3 +125,14 @@ async def global_exception_handler(_request: Request, exc: Exception):
 @app.get("/health", tags=["infra"])
 async def healthcheck():
     return {"status": "ok"}
+
+
+@app.get("/metrics", tags=["infra"])
+async def metrics():
+    stats: dict[str, Any] = {
+        "database": get_pool_stats(),
+        "access_tokens": access_token_cache.stats(),
+    }
+    if replica_engine is not None:
+        stats["database_replica"] = get_pool_stats(replica_engine)
+    return stats
@@ -0,0 +1,50 @@
+# Micro-benchmark of the token codecs: ops/sec for issuing and verifying an
+# access token with python-jose and with the built-in HS256 codec.
+#
+#   python -m scripts.bench_tokens [iterations]
+#
+# Needs the same environment as the app (.env), since it imports app.core.
+import sys
+import time
+import timeit
+from collections.abc import Callable
+
+from app.core.tokens import HS256TokenCodec, JoseTokenCodec, TokenCodec
+
+SECRET = "bench-secret"
+CLAIMS = {"sub": "3f1c1b9e-8a53-4a4e-9d7e-0c2f4f3a9b11", "exp": int(time.time()) + 900}
+
+
+def _ops_per_second(fn: Callable[[], object], iterations: int) -> float:
+    return iterations / min(timeit.repeat(fn, number=iterations, repeat=5))
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    codecs: dict[str, TokenCodec] = {
+        "jose": JoseTokenCodec(SECRET),
+        "hs256": HS256TokenCodec(SECRET),
+    }
+
+    results: dict[str, tuple[float, float]] = {}
+    for name, codec in codecs.items():
+        token = codec.encode(CLAIMS)
+        results[name] = (
+            _ops_per_second(lambda: codec.encode(CLAIMS), iterations),
+            _ops_per_second(lambda: codec.decode(token), iterations),
+        )
+
+    print(f"{'codec':<8}{'encode ops/s':>16}{'decode ops/s':>16}")
+    for name, (encode, decode) in results.items():
+        print(f"{name:<8}{encode:>16,.0f}{decode:>16,.0f}")
+
+    jose_encode, jose_decode = results["jose"]
+    fast_encode, fast_decode = results["hs256"]
+    print(
+        f"speedup  encode x{fast_encode / jose_encode:.1f}"
+        f"  decode x{fast_decode / jose_decode:.1f}",
+    )
+
+
+if __name__ == "__main__":
+    main()